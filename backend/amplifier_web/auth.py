@@ -7,14 +7,18 @@ Single-user model: each server instance serves one user.
 
 from __future__ import annotations
 
+import asyncio
 import fcntl
+import hashlib
 import json
 import os
 import secrets
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 # Auth token storage location
@@ -25,16 +29,25 @@ AUTH_LOCK = AUTH_DIR / ".web-auth.lock"
 # Security scheme for OpenAPI docs
 security = HTTPBearer(auto_error=False)
 
+# Recently verified credentials: sha256(token) -> expiry (monotonic seconds).
+# Only successful verifications are cached, keyed by hash (never plaintext).
+_VERIFIED_TTL = 30.0
+_VERIFIED_MAX = 64
+_verified: dict[bytes, float] = {}
+
+# Generated tokens are 43 chars (token_urlsafe(32)); longer inputs are
+# rejected before hashing/encoding unless they match the expected length
+_MAX_TOKEN_LENGTH = 128
+
 
 def _read_token_from_file() -> str | None:
     """Read token from file if it exists and is valid."""
-    if not AUTH_FILE.exists():
-        return None
     try:
-        data = json.loads(AUTH_FILE.read_text())
+        # Single open+read; a missing file is just FileNotFoundError (OSError)
+        data = json.loads(AUTH_FILE.read_bytes())
         if token := data.get("token"):
             return token
-    except (json.JSONDecodeError, OSError, ValueError):
+    except (json.JSONDecodeError, OSError, ValueError, AttributeError):
         pass
     return None
 
@@ -69,11 +82,26 @@ def get_or_create_token() -> str:
         Uses file locking and atomic writes to prevent race conditions
         when multiple processes start simultaneously. This ensures the
         token remains stable across restarts.
+
+        The file-backed token is cached after first resolution, so only
+        the first call per process touches the filesystem.
     """
     # Check environment variable first (highest priority)
     if env_token := os.environ.get("AMPLIFIER_WEB_TOKEN"):
         return env_token
 
+    return _resolve_token_from_disk()
+
+
+def _invalidate_token_cache() -> None:
+    """Forget the cached token and verified credentials (used by tests)."""
+    _resolve_token_from_disk.cache_clear()
+    _verified.clear()
+
+
+@lru_cache(maxsize=1)
+def _resolve_token_from_disk() -> str:
+    """Read the token file, creating it under a file lock if missing."""
     # Fast path: check existing file without lock
     if token := _read_token_from_file():
         return token
@@ -99,6 +127,69 @@ def get_or_create_token() -> str:
             pass
 
 
+async def init_auth(app: FastAPI) -> str:
+    """
+    Resolve the auth token once at startup and store it in app state.
+
+    Token resolution may take a file lock and write to disk, so it runs
+    on a worker thread to keep it off the event loop. Request handlers
+    then read ``app.state.auth_token`` instead of touching the filesystem.
+
+    Args:
+        app: The FastAPI application.
+
+    Returns:
+        The resolved auth token.
+    """
+    token = await asyncio.to_thread(get_or_create_token)
+    app.state.auth_token = token
+    return token
+
+
+def _check_token(token: str, expected: str | None = None) -> bool:
+    """
+    Check a presented token against the expected one.
+
+    Successful checks are remembered for a short TTL so repeat callers
+    skip token resolution and comparison. Failures are never cached.
+
+    Args:
+        token: The token presented by the client.
+        expected: The expected token, if already known (e.g. from app
+            state). Falls back to get_or_create_token().
+    """
+    if not isinstance(token, str):
+        return False
+    if len(token) > _MAX_TOKEN_LENGTH:
+        # Only a custom AMPLIFIER_WEB_TOKEN can legitimately be this long
+        if expected is None:
+            expected = get_or_create_token()
+        if len(token) != len(expected):
+            return False
+
+    # Compare as bytes: compare_digest rejects non-ASCII str, and a
+    # client-supplied header must never turn into a 500
+    token_bytes = token.encode("utf-8")
+    key = hashlib.sha256(token_bytes).digest()
+    now = time.monotonic()
+
+    expires = _verified.get(key)
+    if expires is not None:
+        if expires > now:
+            return True
+        _verified.pop(key, None)
+
+    if expected is None:
+        expected = get_or_create_token()
+    if not secrets.compare_digest(token_bytes, expected.encode("utf-8")):
+        return False
+
+    if len(_verified) >= _VERIFIED_MAX:
+        _verified.clear()
+    _verified[key] = now + _VERIFIED_TTL
+    return True
+
+
 async def verify_token(
     request: Request,
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
@@ -106,6 +197,10 @@ async def verify_token(
     """
     FastAPI dependency to verify auth token on REST endpoints.
 
+    Deliberately ``async`` even though it never awaits: FastAPI runs plain
+    ``def`` dependencies via ``run_in_threadpool``, so a sync version would
+    cost a thread hop per request instead of an inline call.
+
     Raises:
         HTTPException: 401 if token is missing or invalid.
     """
@@ -116,8 +211,8 @@ async def verify_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    expected_token = get_or_create_token()
-    if credentials.credentials != expected_token:
+    expected_token = getattr(request.app.state, "auth_token", None)
+    if not _check_token(credentials.credentials, expected_token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication token",
@@ -125,18 +220,19 @@ async def verify_token(
         )
 
 
-def verify_websocket_token(token: str) -> bool:
+def verify_websocket_token(token: str, expected_token: str | None = None) -> bool:
     """
     Verify token for WebSocket connection.
 
     Args:
         token: The token to verify.
+        expected_token: Token resolved at startup (``app.state.auth_token``).
+            If omitted, falls back to get_or_create_token().
 
     Returns:
         True if token is valid, False otherwise.
     """
-    expected_token = get_or_create_token()
-    return secrets.compare_digest(token, expected_token)
+    return _check_token(token, expected_token)
 
 
 # Type alias for use in endpoint dependencies
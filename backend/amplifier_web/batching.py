@@ -0,0 +1,144 @@
+"""
+Outbound WebSocket frame batching.
+
+Streaming produces bursts of small messages (content deltas, tool events,
+display messages). BatchingSender collects the frames queued within one
+event-loop tick and sends them as a single frame, amortizing per-frame
+framing and compression costs across the burst.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds for one batch frame; larger bursts are split across frames so
+# the browser can start rendering before the whole burst is parsed
+MAX_BATCH_ITEMS = 64
+MAX_BATCH_CHARS = 64 * 1024
+
+# Hard cap on queued characters: send_text waits while the backlog is above
+# it, so a client that stops reading holds producers back instead of growing
+# the queue without bound
+MAX_BACKLOG_CHARS = 1024 * 1024
+
+
+class BatchingSender:
+    """
+    Coalescing writer for one WebSocket connection.
+
+    Exposes send_text like a WebSocket, so json_utils.send_json works with
+    either. A lone queued frame is sent unchanged; several are wrapped as
+    {"type": "batch", "items": [...]} in the order they were queued. All
+    outbound messages for a connection must go through the same sender to
+    keep their relative order.
+    """
+
+    def __init__(self, websocket: "WebSocket"):
+        """
+        Initialize the sender and start its flush task.
+
+        Args:
+            websocket: Connected WebSocket to browser
+        """
+        self._websocket = websocket
+        self._queue: deque[str] = deque()
+        self._queued_chars = 0
+        self._ready = asyncio.Event()
+        self._drained = asyncio.Event()  # Set whenever the backlog shrinks
+        self._closed = False
+        self._error: Exception | None = None
+        self._task = asyncio.create_task(self._run())
+
+    async def send_text(self, text: str) -> None:
+        """
+        Queue a JSON text frame for the next flush.
+
+        Waits first while more than MAX_BACKLOG_CHARS are queued.
+
+        Raises:
+            RuntimeError: If the sender is closed or an earlier send failed
+        """
+        while (
+            self._queued_chars > MAX_BACKLOG_CHARS
+            and self._error is None
+            and not self._closed
+        ):
+            self._drained.clear()
+            await self._drained.wait()
+        if self._error is not None:
+            raise RuntimeError(f"WebSocket send failed: {self._error}")
+        if self._closed:
+            raise RuntimeError("BatchingSender is closed")
+        self._queue.append(text)
+        self._queued_chars += len(text)
+        self._ready.set()
+
+    @property
+    def backlog(self) -> int:
+        """
+        Characters queued but not yet handed to the WebSocket.
+
+        Grows while the client reads slower than messages are produced
+        (each send waits for the transport to drain), so producers can use
+        it to merge or hold back low-value messages.
+        """
+        return self._queued_chars
+
+    async def close(self) -> None:
+        """Flush any queued frames and stop the flush task."""
+        self._closed = True
+        self._ready.set()
+        self._drained.set()
+        await self._task
+
+    async def _run(self) -> None:
+        """Flush queued frames whenever new ones arrive."""
+        try:
+            while True:
+                await self._ready.wait()
+                # Yield once so every producer scheduled in this tick can
+                # queue its frame before the batch is sent
+                await asyncio.sleep(0)
+                self._ready.clear()
+                await self._flush()
+                if self._closed:
+                    return
+        except Exception as e:
+            self._error = e
+            self._queue.clear()
+            self._queued_chars = 0
+            self._drained.set()
+            logger.warning(f"Failed to send batched WebSocket frames: {e}")
+
+    async def _flush(self) -> None:
+        """Send everything queued, batching multiple frames together."""
+        queue = self._queue
+        while queue:
+            # Take frames in order up to the item/size limits (always at
+            # least one, however large)
+            items = [queue.popleft()]
+            size = len(items[0])
+            while (
+                queue
+                and len(items) < MAX_BATCH_ITEMS
+                and size + len(queue[0]) <= MAX_BATCH_CHARS
+            ):
+                item = queue.popleft()
+                items.append(item)
+                size += len(item)
+            self._queued_chars -= size
+
+            if len(items) == 1:
+                frame = items[0]
+            else:
+                frame = '{"type":"batch","items":[' + ",".join(items) + "]}"
+            await self._websocket.send_text(frame)
+            self._drained.set()
@@ -11,6 +11,7 @@ from __future__ import annotations
 import logging
 import os
 import sys
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
@@ -51,6 +52,32 @@ ALLOWED_PATH_ROOTS = [
     Path("/tmp"),
 ]
 
+# Precomputed forms of the above for validate_file_path (resolved once at import)
+_HOME_STR = str(Path.home())
+_DENIED_PREFIXES = tuple(DENIED_PATH_PATTERNS)
+_ALLOWED_ROOT_PREFIXES = tuple(
+    str(p.resolve()).rstrip(os.sep) + os.sep for p in ALLOWED_PATH_ROOTS
+)
+
+# Providers auto-detected from API keys, in priority order:
+# (env var, display label, module, source, default model)
+_AUTO_PROVIDERS = (
+    (
+        "ANTHROPIC_API_KEY",
+        "Anthropic",
+        "provider-anthropic",
+        "git+https://github.com/microsoft/amplifier-module-provider-anthropic@main",
+        "claude-sonnet-4-5",
+    ),
+    (
+        "OPENAI_API_KEY",
+        "OpenAI",
+        "provider-openai",
+        "git+https://github.com/microsoft/amplifier-module-provider-openai@main",
+        "gpt-4o",
+    ),
+)
+
 
 class BundleManager:
     """
@@ -78,6 +105,17 @@ class BundleManager:
         self._modules_dir = modules_dir
         self._registry: BundleRegistry | None = None
         self._initialized = False
+        # Foundation entry points, bound once by initialize()
+        self._bundle_cls: type[Bundle] | None = None
+        self._load_bundle: Any = None
+        # Successful validate_bundle_uri results: uri -> (expires_at, result)
+        self._uri_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+        self._uri_cache_ttl = 300.0
+        self._uri_cache_max = 256
+        # Auto-detected provider bundles keyed on (has_anthropic, has_openai)
+        self._auto_provider_cache: dict[tuple[bool, bool], Bundle | None] = {}
+        # list_bundles result keyed on preferences file mtime_ns
+        self._list_bundles_cache: tuple[int, list[BundleInfo]] | None = None
 
     async def initialize(self) -> None:
         """
@@ -90,19 +128,28 @@ class BundleManager:
 
         # Add submodules to sys.path if available
         if self._modules_dir:
-            for subdir in [
+            seen = set(sys.path)
+            new_paths = []
+            for subdir in (
                 "amplifier-core",
                 "amplifier-foundation",
                 "amplifier-app-cli",
-            ]:
+            ):
                 module_path = self._modules_dir / subdir
-                if module_path.exists() and str(module_path) not in sys.path:
-                    sys.path.insert(0, str(module_path))
+                path_str = str(module_path)
+                if path_str not in seen and module_path.exists():
+                    seen.add(path_str)
+                    new_paths.append(path_str)
                     logger.info(f"Added {module_path} to sys.path")
+            # Prepend in one slice assignment instead of repeated insert(0, ...)
+            sys.path[:0] = new_paths
 
         try:
-            from amplifier_foundation.registry import BundleRegistry
+            from amplifier_foundation import Bundle
+            from amplifier_foundation.registry import BundleRegistry, load_bundle
 
+            self._bundle_cls = Bundle
+            self._load_bundle = load_bundle
             self._registry = BundleRegistry()
             self._initialized = True
             logger.info("Bundle manager initialized with amplifier-foundation")
@@ -163,8 +210,8 @@ class BundleManager:
         """
         await self.initialize()
 
-        from amplifier_foundation import Bundle
-        from amplifier_foundation.registry import load_bundle
+        Bundle = self._bundle_cls
+        load_bundle = self._load_bundle
 
         # Load the base bundle
         bundle = await load_bundle(bundle_name, registry=self._registry)
@@ -274,54 +321,45 @@ class BundleManager:
 
         Returns:
             Provider Bundle if API key found, None otherwise.
-        """
-        from amplifier_foundation import Bundle
-
-        # Check for Anthropic API key
-        if os.getenv("ANTHROPIC_API_KEY"):
-            try:
-                provider = Bundle(
-                    name="auto-provider-anthropic",
-                    version="1.0.0",
-                    providers=[
-                        {
-                            "module": "provider-anthropic",
-                            "source": "git+https://github.com/microsoft/amplifier-module-provider-anthropic@main",
-                            "config": {
-                                "default_model": "claude-sonnet-4-5",
-                                "debug": True,
-                                "raw_debug": True,
-                            },
-                        }
-                    ],
-                )
-                logger.info("Auto-detected Anthropic provider from environment")
-                return provider
-            except Exception as e:
-                logger.warning(f"Failed to create Anthropic provider: {e}")
 
-        # Check for OpenAI API key
-        if os.getenv("OPENAI_API_KEY"):
+        Note:
+            The result only depends on which keys are set, so it is built
+            once per key combination and reused (compose() never mutates
+            its arguments).
+        """
+        key = (
+            bool(os.getenv("ANTHROPIC_API_KEY")),
+            bool(os.getenv("OPENAI_API_KEY")),
+        )
+        if key not in self._auto_provider_cache:
+            self._auto_provider_cache[key] = self._build_auto_provider()
+        return self._auto_provider_cache[key]
+
+    def _build_auto_provider(self) -> "Bundle | None":
+        """Build the provider bundle for the API keys in the environment."""
+        for env_var, label, module, source, default_model in _AUTO_PROVIDERS:
+            if not os.getenv(env_var):
+                continue
             try:
-                provider = Bundle(
-                    name="auto-provider-openai",
+                provider = self._bundle_cls(
+                    name=f"auto-{module}",
                     version="1.0.0",
                     providers=[
                         {
-                            "module": "provider-openai",
-                            "source": "git+https://github.com/microsoft/amplifier-module-provider-openai@main",
+                            "module": module,
+                            "source": source,
                             "config": {
-                                "default_model": "gpt-4o",
+                                "default_model": default_model,
                                 "debug": True,
                                 "raw_debug": True,
                             },
                         }
                     ],
                 )
-                logger.info("Auto-detected OpenAI provider from environment")
+                logger.info(f"Auto-detected {label} provider from environment")
                 return provider
             except Exception as e:
-                logger.warning(f"Failed to create OpenAI provider: {e}")
+                logger.warning(f"Failed to create {label} provider: {e}")
 
         logger.warning(
             "No API key found in environment (ANTHROPIC_API_KEY or OPENAI_API_KEY)"
@@ -334,10 +372,24 @@ class BundleManager:
 
         Returns:
             List of BundleInfo with name and description.
+
+        Note:
+            The list is cached until the preferences file changes.
         """
         await self.initialize()
 
-        from .preferences import load_preferences
+        from .preferences import PREFS_FILE, load_preferences
+
+        try:
+            prefs_mtime = os.stat(PREFS_FILE).st_mtime_ns
+        except OSError:
+            prefs_mtime = -1
+
+        if (
+            self._list_bundles_cache is not None
+            and self._list_bundles_cache[0] == prefs_mtime
+        ):
+            return list(self._list_bundles_cache[1])
 
         bundles = []
 
@@ -352,17 +404,22 @@ class BundleManager:
 
         # Add custom bundles from preferences
         prefs = load_preferences()
-        for custom in prefs.custom_bundles:
+        for uri, custom in prefs.custom_bundles.items():
             bundles.append(
                 BundleInfo(
                     name=custom.get("name", "unknown"),
                     description=custom.get("description", ""),
                     is_custom=True,
-                    uri=custom.get("uri"),
+                    uri=uri,
                 )
             )
 
-        return bundles
+        self._list_bundles_cache = (prefs_mtime, bundles)
+        return list(bundles)
+
+    def invalidate_list_cache(self) -> None:
+        """Drop the cached list_bundles result."""
+        self._list_bundles_cache = None
 
     async def get_bundle_info(self, bundle_name: str) -> dict[str, Any]:
         """
@@ -376,9 +433,7 @@ class BundleManager:
         """
         await self.initialize()
 
-        from amplifier_foundation.registry import load_bundle
-
-        bundle = await load_bundle(bundle_name, registry=self._registry)
+        bundle = await self._load_bundle(bundle_name, registry=self._registry)
 
         return {
             "name": bundle.name,
@@ -410,33 +465,30 @@ class BundleManager:
 
         # Expand ~ to home directory
         if path_str.startswith("~"):
-            path_str = str(Path.home()) + path_str[1:]
+            path_str = _HOME_STR + path_str[1:]
 
         try:
             path = Path(path_str).resolve()
         except Exception as e:
             return False, f"Invalid path: {e}"
-
-        # Check for path traversal attempts
-        if ".." in str(path):
-            return False, "Path traversal not allowed"
+        # resolve() has already collapsed any ".." segments, so traversal is
+        # enforced by the allowed-root containment check below
+        path_str_resolved = str(path)
 
         # Check against denied patterns
-        path_str_resolved = str(path)
-        for denied in DENIED_PATH_PATTERNS:
-            if path_str_resolved.startswith(denied):
-                return False, f"Access to {denied} not allowed"
+        if path_str_resolved.startswith(_DENIED_PREFIXES):
+            denied = next(
+                d for d in _DENIED_PREFIXES if path_str_resolved.startswith(d)
+            )
+            return False, f"Access to {denied} not allowed"
 
         # Check against allowed roots
-        for allowed in ALLOWED_PATH_ROOTS:
-            try:
-                if path.is_relative_to(allowed):
-                    # Path must exist
-                    if not path.exists():
-                        return False, f"Path does not exist: {path}"
-                    return True, None
-            except ValueError:
-                continue
+        # (trailing separator makes the root itself match, but not /tmpfoo)
+        if (path_str_resolved + os.sep).startswith(_ALLOWED_ROOT_PREFIXES):
+            # Path must exist
+            if not path.exists():
+                return False, f"Path does not exist: {path}"
+            return True, None
 
         return False, "Path must be under home directory or /tmp"
 
@@ -453,9 +505,32 @@ class BundleManager:
 
         Returns:
             Dict with validation result and bundle info if valid.
+
+        Note:
+            Successful results are cached per URI for a few minutes so
+            repeat validations don't reload (or re-fetch) the bundle.
         """
         await self.initialize()
 
+        cached = self._uri_cache.get(uri)
+        if cached is not None:
+            expires_at, cached_result = cached
+            if expires_at > time.monotonic():
+                return cached_result
+            del self._uri_cache[uri]
+
+        result = await self._validate_bundle_uri_uncached(uri)
+
+        if result["valid"]:
+            if len(self._uri_cache) >= self._uri_cache_max:
+                # FIFO eviction: dicts preserve insertion order
+                del self._uri_cache[next(iter(self._uri_cache))]
+            self._uri_cache[uri] = (time.monotonic() + self._uri_cache_ttl, result)
+
+        return result
+
+    async def _validate_bundle_uri_uncached(self, uri: str) -> dict[str, Any]:
+        """Validate a bundle URI by loading it (see validate_bundle_uri)."""
         result: dict[str, Any] = {
             "valid": False,
             "uri": uri,
@@ -472,14 +547,12 @@ class BundleManager:
 
             # Try to load the bundle to verify it's valid
             try:
-                from amplifier_foundation.registry import load_bundle
-
                 # Extract the actual path
                 path_str = uri[7:]
                 if path_str.startswith("~"):
-                    path_str = str(Path.home()) + path_str[1:]
+                    path_str = _HOME_STR + path_str[1:]
 
-                bundle = await load_bundle(path_str, registry=self._registry)
+                bundle = await self._load_bundle(path_str, registry=self._registry)
                 result["valid"] = True
                 result["bundle_info"] = {
                     "name": bundle.name,
@@ -500,9 +573,7 @@ class BundleManager:
 
             # Try to load via foundation's git support
             try:
-                from amplifier_foundation.registry import load_bundle
-
-                bundle = await load_bundle(uri, registry=self._registry)
+                bundle = await self._load_bundle(uri, registry=self._registry)
                 result["valid"] = True
                 result["bundle_info"] = {
                     "name": bundle.name,
@@ -553,6 +624,7 @@ class BundleManager:
         from .preferences import add_custom_bundle
 
         add_custom_bundle(uri, final_name, final_description)
+        self.invalidate_list_cache()
 
         return {
             "success": True,
@@ -577,7 +649,9 @@ class BundleManager:
         prefs = load_preferences()
 
         # Check if bundle exists
-        exists = any(b.get("name") == name for b in prefs.custom_bundles)
+        exists = any(
+            b.get("name") == name for b in prefs.custom_bundles.values()
+        )
         if not exists:
             return {
                 "success": False,
@@ -585,6 +659,7 @@ class BundleManager:
             }
 
         remove_custom_bundle(name)
+        self.invalidate_list_cache()
         return {
             "success": True,
             "name": name,
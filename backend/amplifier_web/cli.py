@@ -11,6 +11,37 @@ from pathlib import Path
 
 import click
 
+# Backend source directory watched for auto-reload in --dev mode
+_RELOAD_DIR = str(Path(__file__).parent)
+
+
+def server_impls() -> dict[str, str]:
+    """
+    Pick uvicorn's event loop and HTTP parser implementations.
+
+    Prefers uvloop and httptools (both installed by uvicorn[standard] on
+    Linux/macOS) for cheaper awaits on the WebSocket hot path, falling back
+    to the stdlib asyncio loop and h11 where they aren't available.
+
+    Returns:
+        Keyword arguments for uvicorn.run
+    """
+    try:
+        import uvloop  # noqa: F401
+
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+
+    try:
+        import httptools  # noqa: F401
+
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+
+    return {"loop": loop, "http": http}
+
 
 @click.command()
 @click.option("--port", default=4000, help="Port to listen on")
@@ -56,7 +87,7 @@ def main(
     import uvicorn
 
     from .auth import get_or_create_token, AUTH_FILE
-    from .tls import get_or_create_cert, CERT_FILE, KEY_FILE
+    from .tls import get_or_create_cert
 
     # Development mode overrides
     if dev:
@@ -85,52 +116,48 @@ def main(
     protocol = "http" if no_tls else "https"
     display_host = "localhost" if host == "127.0.0.1" else host
 
-    click.echo()
-    click.echo(
+    banner = [
+        "",
         click.style(
             "╔═══════════════════════════════════════════════════════════╗", fg="cyan"
-        )
-    )
-    click.echo(
+        ),
         click.style(
             "║              Amplifier Web Server                         ║", fg="cyan"
-        )
-    )
-    click.echo(
+        ),
         click.style(
             "╚═══════════════════════════════════════════════════════════╝", fg="cyan"
-        )
-    )
-    click.echo()
-
-    click.echo(
-        f"  Server URL:  {click.style(f'{protocol}://{display_host}:{port}', fg='green', bold=True)}"
-    )
-    click.echo()
+        ),
+        "",
+        f"  Server URL:  {click.style(f'{protocol}://{display_host}:{port}', fg='green', bold=True)}",
+        "",
+    ]
 
     if not no_tls:
-        click.echo(f"  TLS Certificate: {ssl_certfile}")
-        click.echo(f"  TLS Private Key: {ssl_keyfile}")
-        click.echo()
-        click.echo(
+        banner += [
+            f"  TLS Certificate: {ssl_certfile}",
+            f"  TLS Private Key: {ssl_keyfile}",
+            "",
             click.style("  Note: ", fg="yellow")
-            + "Your browser will show a security warning for"
-        )
-        click.echo(
-            "        self-signed certificates. This is expected - accept it once"
-        )
-        click.echo("        and it will be remembered.")
-        click.echo()
-
-    click.echo(f"  Auth Token File: {AUTH_FILE}")
-    click.echo()
-    click.echo(click.style("  Your auth token:", fg="yellow"))
-    click.echo(f"    {click.style(token, fg='bright_white', bold=True)}")
-    click.echo()
-    click.echo("  Enter this token when prompted in the browser.")
-    click.echo()
-    click.echo(click.style("═" * 61, fg="cyan"))
-    click.echo()
+            + "Your browser will show a security warning for",
+            "        self-signed certificates. This is expected - accept it once",
+            "        and it will be remembered.",
+            "",
+        ]
+
+    banner += [
+        f"  Auth Token File: {AUTH_FILE}",
+        "",
+        click.style("  Your auth token:", fg="yellow"),
+        f"    {click.style(token, fg='bright_white', bold=True)}",
+        "",
+        "  Enter this token when prompted in the browser.",
+        "",
+        click.style("═" * 61, fg="cyan"),
+        "",
+    ]
+
+    # Single write instead of one echo (write + flush) per line
+    click.echo("\n".join(banner))
 
     # Set environment variables for the app
     os.environ["AMPLIFIER_WEB_HOST"] = host
@@ -146,8 +173,12 @@ def main(
         ssl_certfile=ssl_certfile,
         ssl_keyfile=ssl_keyfile,
         reload=dev,
-        reload_dirs=[str(Path(__file__).parent)] if dev else None,
+        reload_dirs=[_RELOAD_DIR] if dev else None,
         log_level="info",
+        # Frames are small JSON messages, mostly on localhost or behind a
+        # proxy; per-message zlib costs more CPU than it saves
+        ws_per_message_deflate=False,
+        **server_impls(),
     )
 
 
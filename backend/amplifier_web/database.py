@@ -6,15 +6,311 @@ Stores sessions, messages, and file artifacts with full history.
 
 from __future__ import annotations
 
-import json
 import sqlite3
+import threading
+import time
+import zlib
 from contextlib import contextmanager
-from datetime import datetime
+from enum import IntEnum
 from pathlib import Path
 from typing import Any, Generator
 
+from . import json_utils
+
 DEFAULT_DB_PATH = Path.home() / ".amplifier" / "amplifier-web.db"
 
+# Per-connection tuning (these settings don't persist in the database file).
+# foreign_keys stays off: artifacts are recorded for sessions that have no
+# row in the sessions table, so enforcing FKs would reject those inserts.
+CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA synchronous=NORMAL",  # Safe with WAL; one fsync per checkpoint
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # ~64 MB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MB
+)
+
+# Bumped when a migration is added to Database._init_schema
+SCHEMA_VERSION = 2
+
+
+class SessionStatus(IntEnum):
+    """Stored codes for sessions.status."""
+
+    ACTIVE = 0
+    SAVED = 1
+
+
+class Role(IntEnum):
+    """Stored codes for messages.role."""
+
+    SYSTEM = 0
+    USER = 1
+    ASSISTANT = 2
+    TOOL = 3
+
+
+class Operation(IntEnum):
+    """Stored codes for artifacts.operation."""
+
+    CREATE = 0
+    EDIT = 1
+    DELETE = 2
+    BASH = 3
+
+
+def _encode(enum_cls: type[IntEnum], value: str) -> int:
+    """Map an API string (e.g. "assistant") to its stored integer code."""
+    try:
+        return enum_cls[value.upper()].value
+    except KeyError:
+        raise ValueError(f"Unknown {enum_cls.__name__} value: {value!r}") from None
+
+
+def _decode(column: str, enum_cls: type[IntEnum]) -> str:
+    """SQL expression mapping an integer code column back to its string."""
+    whens = " ".join(f"WHEN {m.value} THEN '{m.name.lower()}'" for m in enum_cls)
+    return f"CASE {column} {whens} END"
+
+
+def _encode_legacy(column: str, enum_cls: type[IntEnum], default: IntEnum) -> str:
+    """
+    SQL expression converting a legacy text column to its integer code.
+
+    Matching is case-insensitive, and anything unrecognized (including NULL)
+    maps to default, so the migration never fails on a stray legacy value.
+    """
+    whens = " ".join(f"WHEN '{m.name.lower()}' THEN {m.value}" for m in enum_cls)
+    return f"CASE lower({column}) {whens} ELSE {default.value} END"
+
+
+def _iso(column: str) -> str:
+    """SQL expression formatting an epoch-nanoseconds column as ISO 8601 UTC."""
+    return f"strftime('%Y-%m-%dT%H:%M:%fZ', {column} / 1e9, 'unixepoch')"
+
+
+def _epoch_ns(column: str) -> str:
+    """SQL expression converting a legacy ISO 8601 text column to epoch ns."""
+    return (
+        f"COALESCE(CAST(ROUND((julianday(rtrim({column}, 'Z')) - 2440587.5)"
+        f" * 86400000) AS INTEGER) * 1000000, 0)"
+    )
+
+
+_SESSION_COLUMNS = f"""
+    id, bundle_name, name, cwd,
+    {_decode("status", SessionStatus)} AS status,
+    turn_count,
+    {_iso("created_at")} AS created_at,
+    {_iso("updated_at")} AS updated_at
+"""
+
+_MESSAGE_COLUMNS = f"""
+    id, session_id, {_decode("role", Role)} AS role,
+    content, tool_calls, tool_call_id, name,
+    {_iso("timestamp")} AS timestamp
+"""
+
+_INSERT_ARTIFACT_SQL = """
+    INSERT INTO artifacts
+    (session_id, message_id, file_path, operation, content_before, content_after,
+     content_before_z, content_after_z, diff, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# File contents at least this large are stored zlib-compressed in the *_z
+# BLOB columns instead of as TEXT (source files typically shrink 3-5x)
+COMPRESS_MIN_BYTES = 4096
+
+# Artifact columns as returned to callers; compressed contents are inflated
+# by the zlib_inflate SQL function only for the rows actually selected
+_ARTIFACT_COLUMNS = f"""
+    id, session_id, message_id, file_path,
+    {_decode("operation", Operation)} AS operation,
+    COALESCE(content_before, zlib_inflate(content_before_z)) AS content_before,
+    COALESCE(content_after, zlib_inflate(content_after_z)) AS content_after,
+    diff, {_iso("timestamp")} AS timestamp
+"""
+
+# Recurring queries are module constants so each is built once and always
+# hits the connection's prepared-statement cache
+_INSERT_SESSION_SQL = """
+    INSERT INTO sessions (id, bundle_name, name, cwd, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_SELECT_SESSION_SQL = f"SELECT {_SESSION_COLUMNS} FROM sessions WHERE id = ?"
+
+_LIST_SESSIONS_SQL = f"""
+    SELECT {_SESSION_COLUMNS} FROM sessions
+    ORDER BY sessions.updated_at DESC
+    LIMIT ? OFFSET ?
+"""
+
+_INSERT_MESSAGE_SQL = """
+    INSERT INTO messages
+    (session_id, role, content, tool_calls, tool_call_id, name, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    RETURNING id
+"""
+
+_SELECT_MESSAGES_SQL = f"""
+    SELECT {_MESSAGE_COLUMNS} FROM messages
+    WHERE session_id = ?
+    ORDER BY id ASC
+"""
+
+_SELECT_ARTIFACTS_SQL = f"""
+    SELECT {_ARTIFACT_COLUMNS} FROM artifacts
+    WHERE session_id = ?
+    ORDER BY id ASC
+"""
+
+_SELECT_ARTIFACTS_JSON_SQL = f"""
+    SELECT json_group_array(json_object(
+        'id', id,
+        'session_id', session_id,
+        'message_id', message_id,
+        'file_path', file_path,
+        'operation', operation,
+        'content_before', content_before,
+        'content_after', content_after,
+        'diff', diff,
+        'timestamp', timestamp
+    ))
+    FROM ({_SELECT_ARTIFACTS_SQL})
+"""
+
+_SELECT_ARTIFACT_SQL = f"SELECT {_ARTIFACT_COLUMNS} FROM artifacts WHERE id = ?"
+
+# Current schema, one statement each so _init_schema can run them inside its
+# own transaction
+_SCHEMA_STATEMENTS = (
+    # Sessions table
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id TEXT PRIMARY KEY,
+        bundle_name TEXT NOT NULL,
+        name TEXT,
+        cwd TEXT,
+        status INTEGER NOT NULL DEFAULT 0  -- SessionStatus
+            CHECK (status IN (0, 1)),
+        turn_count INTEGER DEFAULT 0,
+        created_at INTEGER NOT NULL,  -- epoch nanoseconds (UTC)
+        updated_at INTEGER NOT NULL
+    )
+    """,
+    # Messages table (conversation history)
+    """
+    CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        role INTEGER NOT NULL CHECK (role IN (0, 1, 2, 3)),  -- Role
+        content TEXT,
+        tool_calls TEXT,  -- JSON array of tool calls
+        tool_call_id TEXT,
+        name TEXT,
+        timestamp INTEGER NOT NULL,  -- epoch nanoseconds (UTC)
+        FOREIGN KEY (session_id) REFERENCES sessions(id)
+    )
+    """,
+    # Artifacts table (file changes)
+    """
+    CREATE TABLE IF NOT EXISTS artifacts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        message_id INTEGER,
+        file_path TEXT NOT NULL,
+        operation INTEGER NOT NULL  -- Operation
+            CHECK (operation IN (0, 1, 2, 3)),
+        content_before TEXT,
+        content_after TEXT,
+        content_before_z BLOB,  -- zlib, when content_before is large
+        content_after_z BLOB,  -- zlib, when content_after is large
+        diff TEXT,
+        timestamp INTEGER NOT NULL,  -- epoch nanoseconds (UTC)
+        FOREIGN KEY (session_id) REFERENCES sessions(id),
+        FOREIGN KEY (message_id) REFERENCES messages(id)
+    )
+    """,
+    # Indexes for performance. (session_id, id) serves the per-session
+    # "ORDER BY id" reads without a sort step and replaces the older
+    # single-column session_id indexes.
+    "CREATE INDEX IF NOT EXISTS idx_messages_session_id"
+    " ON messages(session_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_artifacts_session_id"
+    " ON artifacts(session_id, id)",
+    "DROP INDEX IF EXISTS idx_messages_session",
+    "DROP INDEX IF EXISTS idx_artifacts_session",
+    "CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at DESC)",
+    # Keep session timestamp and turn count in step with messages
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_messages_touch_session
+    AFTER INSERT ON messages
+    BEGIN
+        UPDATE sessions
+        SET updated_at = NEW.timestamp, turn_count = turn_count + 1
+        WHERE id = NEW.session_id;
+    END
+    """,
+    # Cascade session deletes (foreign_keys is off; see pragmas)
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_sessions_cascade_delete
+    AFTER DELETE ON sessions
+    BEGIN
+        DELETE FROM artifacts WHERE session_id = OLD.id;
+        DELETE FROM messages WHERE session_id = OLD.id;
+    END
+    """,
+)
+
+# Room for every constant above plus update_session's column combinations
+_STATEMENT_CACHE_SIZE = 256
+
+
+def _compress_content(text: str | None) -> tuple[str | None, bytes | None]:
+    """Split content into (text, compressed) with exactly one set for large text."""
+    if text is None:
+        return None, None
+    data = text.encode("utf-8")
+    if len(data) < COMPRESS_MIN_BYTES:
+        return text, None
+    return None, zlib.compress(data, 6)
+
+
+def _zlib_inflate(blob: bytes | None) -> str | None:
+    """SQL function: decompress a *_z column back to text."""
+    if blob is None:
+        return None
+    return zlib.decompress(blob).decode("utf-8")
+
+
+def _artifact_row(
+    session_id: str,
+    message_id: int | None,
+    file_path: str,
+    operation: str,
+    content_before: str | None,
+    content_after: str | None,
+    diff: str | None,
+    timestamp: int,
+) -> tuple[Any, ...]:
+    """Build the parameter tuple for _INSERT_ARTIFACT_SQL."""
+    before_text, before_z = _compress_content(content_before)
+    after_text, after_z = _compress_content(content_after)
+    return (
+        session_id,
+        message_id,
+        file_path,
+        _encode(Operation, operation),
+        before_text,
+        after_text,
+        before_z,
+        after_z,
+        diff,
+        timestamp,
+    )
+
 
 class Database:
     """SQLite database for persistent session storage."""
@@ -22,71 +318,174 @@ class Database:
     def __init__(self, db_path: Path | None = None):
         self.db_path = db_path or DEFAULT_DB_PATH
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One long-lived connection, shared across threads and serialized by
+        # a lock, so the page cache stays warm between calls
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
         self._init_schema()
 
+    def _get_conn(self) -> sqlite3.Connection:
+        """Open the shared connection on first use."""
+        if self._conn is None:
+            conn = sqlite3.connect(
+                str(self.db_path),
+                check_same_thread=False,
+                cached_statements=_STATEMENT_CACHE_SIZE,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.create_function(
+                "zlib_inflate", 1, _zlib_inflate, deterministic=True
+            )
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._conn = conn
+        return self._conn
+
     @contextmanager
     def _connection(self) -> Generator[sqlite3.Connection, None, None]:
-        """Context manager for database connections."""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+        """Context manager yielding the shared connection as one transaction."""
+        with self._lock:
+            conn = self._get_conn()
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def close(self) -> None:
+        """Close the shared connection (reopened on next use)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
     def _init_schema(self) -> None:
-        """Initialize database schema."""
+        """
+        Initialize the database schema, migrating older versions in place.
+
+        Everything after the journal mode switch runs in one explicit
+        transaction, statement by statement (executescript would commit
+        part way through), so a failed migration leaves the file untouched.
+        """
         with self._connection() as conn:
-            conn.executescript("""
-                -- Sessions table
-                CREATE TABLE IF NOT EXISTS sessions (
-                    id TEXT PRIMARY KEY,
-                    bundle_name TEXT NOT NULL,
-                    name TEXT,
-                    cwd TEXT,
-                    status TEXT DEFAULT 'active',
-                    turn_count INTEGER DEFAULT 0,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                );
-
-                -- Messages table (conversation history)
-                CREATE TABLE IF NOT EXISTS messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    role TEXT NOT NULL,
-                    content TEXT,
-                    tool_calls TEXT,  -- JSON array of tool calls
-                    tool_call_id TEXT,
-                    name TEXT,
-                    timestamp TEXT NOT NULL,
-                    FOREIGN KEY (session_id) REFERENCES sessions(id)
-                );
-
-                -- Artifacts table (file changes)
-                CREATE TABLE IF NOT EXISTS artifacts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    message_id INTEGER,
-                    file_path TEXT NOT NULL,
-                    operation TEXT NOT NULL,  -- 'create', 'edit', 'delete'
-                    content_before TEXT,
-                    content_after TEXT,
-                    diff TEXT,
-                    timestamp TEXT NOT NULL,
-                    FOREIGN KEY (session_id) REFERENCES sessions(id),
-                    FOREIGN KEY (message_id) REFERENCES messages(id)
-                );
-
-                -- Indexes for performance
-                CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id);
-                CREATE INDEX IF NOT EXISTS idx_artifacts_session ON artifacts(session_id);
-                CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at DESC);
-            """)
+            # WAL lets readers proceed during writes; it is persistent, so
+            # setting it once here covers all later connections. It can't be
+            # changed inside a transaction. In-memory databases can't use WAL.
+            if str(self.db_path) != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            has_tables = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table'"
+                " AND name IN ('sessions', 'sessions_legacy')"
+            ).fetchone()
+            migrate = has_tables and version < SCHEMA_VERSION
+            if migrate:
+                self._rename_legacy_tables(conn)
+
+            for statement in _SCHEMA_STATEMENTS:
+                conn.execute(statement)
+
+            # Migrate databases created before compressed content columns
+            artifact_cols = {
+                row[1] for row in conn.execute("PRAGMA table_info(artifacts)")
+            }
+            for col in ("content_before_z", "content_after_z"):
+                if col not in artifact_cols:
+                    conn.execute(f"ALTER TABLE artifacts ADD COLUMN {col} BLOB")
+
+            if migrate:
+                self._copy_legacy_tables(conn, version)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _rename_legacy_tables(conn: sqlite3.Connection) -> None:
+        """
+        Move tables from an older schema version aside so _init_schema can
+        create the current ones; _copy_legacy_tables moves the rows back.
+        Picks up *_legacy tables left behind by an interrupted migration.
+        """
+        for trigger in ("trg_messages_touch_session", "trg_sessions_cascade_delete"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        for index in (
+            "idx_messages_session",
+            "idx_artifacts_session",
+            "idx_messages_session_id",
+            "idx_artifacts_session_id",
+            "idx_sessions_updated",
+        ):
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
+        tables = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        for table in ("sessions", "messages", "artifacts"):
+            if f"{table}_legacy" in tables:
+                # Left by an interrupted migration from before migrations were
+                # transactional: the legacy copy still holds every row and the
+                # current-schema table next to it was never filled
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            else:
+                conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+
+    @staticmethod
+    def _copy_legacy_tables(conn: sqlite3.Connection, from_version: int) -> None:
+        """
+        Copy rows out of the *_legacy tables into the current schema.
+
+        Args:
+            conn: Open connection (inside the schema transaction)
+            from_version: user_version of the legacy tables. Before v1
+                timestamps were ISO 8601 text; before v2 status, role and
+                operation were text (unknown values fall back to a default).
+        """
+
+        def ts(column: str) -> str:
+            return _epoch_ns(column) if from_version < 1 else column
+
+        def code(column: str, enum_cls: type[IntEnum], default: IntEnum) -> str:
+            if from_version < 2:
+                return _encode_legacy(column, enum_cls, default)
+            return column
+
+        artifact_cols = {
+            row[1] for row in conn.execute("PRAGMA table_info(artifacts_legacy)")
+        }
+        before_z = "content_before_z" if "content_before_z" in artifact_cols else "NULL"
+        after_z = "content_after_z" if "content_after_z" in artifact_cols else "NULL"
+
+        # Messages go first: trg_messages_touch_session is a no-op while
+        # sessions is still empty, so legacy turn counts are kept as-is
+        conn.execute(f"""
+            INSERT INTO messages
+            (id, session_id, role, content, tool_calls, tool_call_id, name, timestamp)
+            SELECT id, session_id, {code("role", Role, Role.USER)}, content,
+                   tool_calls, tool_call_id, name, {ts("timestamp")}
+            FROM messages_legacy
+        """)
+        conn.execute(f"""
+            INSERT INTO artifacts
+            (id, session_id, message_id, file_path, operation, content_before,
+             content_after, content_before_z, content_after_z, diff, timestamp)
+            SELECT id, session_id, message_id, file_path,
+                   {code("operation", Operation, Operation.EDIT)}, content_before,
+                   content_after, {before_z}, {after_z}, diff, {ts("timestamp")}
+            FROM artifacts_legacy
+        """)
+        conn.execute(f"""
+            INSERT INTO sessions
+            (id, bundle_name, name, cwd, status, turn_count, created_at, updated_at)
+            SELECT id, bundle_name, name, cwd,
+                   {code("status", SessionStatus, SessionStatus.ACTIVE)}, turn_count,
+                   {ts("created_at")}, {ts("updated_at")}
+            FROM sessions_legacy
+        """)
+        for table in ("sessions", "messages", "artifacts"):
+            conn.execute(f"DROP TABLE {table}_legacy")
 
     # Session operations
     def create_session(
@@ -97,23 +496,17 @@ class Database:
         name: str | None = None,
     ) -> dict[str, Any]:
         """Create a new session."""
-        now = datetime.utcnow().isoformat() + "Z"
+        now = time.time_ns()
         with self._connection() as conn:
             conn.execute(
-                """
-                INSERT INTO sessions (id, bundle_name, name, cwd, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (session_id, bundle_name, name, cwd, now, now),
+                _INSERT_SESSION_SQL, (session_id, bundle_name, name, cwd, now, now)
             )
         return self.get_session(session_id)
 
     def get_session(self, session_id: str) -> dict[str, Any] | None:
         """Get session by ID."""
         with self._connection() as conn:
-            row = conn.execute(
-                "SELECT * FROM sessions WHERE id = ?", (session_id,)
-            ).fetchone()
+            row = conn.execute(_SELECT_SESSION_SQL, (session_id,)).fetchone()
             if row:
                 return dict(row)
         return None
@@ -133,14 +526,14 @@ class Database:
             params.append(name)
         if status is not None:
             updates.append("status = ?")
-            params.append(status)
+            params.append(_encode(SessionStatus, status))
         if turn_count is not None:
             updates.append("turn_count = ?")
             params.append(turn_count)
 
         if updates:
             updates.append("updated_at = ?")
-            params.append(datetime.utcnow().isoformat() + "Z")
+            params.append(time.time_ns())
             params.append(session_id)
 
             with self._connection() as conn:
@@ -152,22 +545,22 @@ class Database:
     def list_sessions(self, limit: int = 50, offset: int = 0) -> list[dict[str, Any]]:
         """List sessions ordered by most recent."""
         with self._connection() as conn:
-            rows = conn.execute(
-                """
-                SELECT * FROM sessions
-                ORDER BY updated_at DESC
-                LIMIT ? OFFSET ?
-                """,
-                (limit, offset),
-            ).fetchall()
+            rows = conn.execute(_LIST_SESSIONS_SQL, (limit, offset)).fetchall()
             return [dict(row) for row in rows]
 
     def delete_session(self, session_id: str) -> None:
         """Delete a session and all its data."""
         with self._connection() as conn:
-            conn.execute("DELETE FROM artifacts WHERE session_id = ?", (session_id,))
-            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
-            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            # trg_sessions_cascade_delete removes the session's messages/artifacts
+            cursor = conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            if cursor.rowcount == 0:
+                # No session row (artifacts can be recorded without one)
+                conn.execute(
+                    "DELETE FROM artifacts WHERE session_id = ?", (session_id,)
+                )
+                conn.execute(
+                    "DELETE FROM messages WHERE session_id = ?", (session_id,)
+                )
 
     # Message operations
     def add_message(
@@ -180,45 +573,35 @@ class Database:
         name: str | None = None,
     ) -> int:
         """Add a message to session history."""
-        now = datetime.utcnow().isoformat() + "Z"
-        tool_calls_json = json.dumps(tool_calls) if tool_calls else None
+        now = time.time_ns()
+        tool_calls_json = json_utils.dumps(tool_calls) if tool_calls else None
 
+        # Session updated_at/turn_count are bumped by trg_messages_touch_session
         with self._connection() as conn:
-            cursor = conn.execute(
-                """
-                INSERT INTO messages (session_id, role, content, tool_calls, tool_call_id, name, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (session_id, role, content, tool_calls_json, tool_call_id, name, now),
-            )
-            # Update session timestamp and turn count
-            conn.execute(
-                """
-                UPDATE sessions 
-                SET updated_at = ?, turn_count = turn_count + 1
-                WHERE id = ?
-                """,
-                (now, session_id),
-            )
-            return cursor.lastrowid
+            row = conn.execute(
+                _INSERT_MESSAGE_SQL,
+                (
+                    session_id,
+                    _encode(Role, role),
+                    content,
+                    tool_calls_json,
+                    tool_call_id,
+                    name,
+                    now,
+                ),
+            ).fetchone()
+            return row[0]
 
     def get_messages(self, session_id: str) -> list[dict[str, Any]]:
         """Get all messages for a session."""
         with self._connection() as conn:
-            rows = conn.execute(
-                """
-                SELECT * FROM messages
-                WHERE session_id = ?
-                ORDER BY id ASC
-                """,
-                (session_id,),
-            ).fetchall()
+            rows = conn.execute(_SELECT_MESSAGES_SQL, (session_id,)).fetchall()
 
             messages = []
             for row in rows:
                 msg = dict(row)
                 if msg["tool_calls"]:
-                    msg["tool_calls"] = json.loads(msg["tool_calls"])
+                    msg["tool_calls"] = json_utils.loads(msg["tool_calls"])
                 messages.append(msg)
             return messages
 
@@ -234,16 +617,12 @@ class Database:
         message_id: int | None = None,
     ) -> int:
         """Record a file artifact (change)."""
-        now = datetime.utcnow().isoformat() + "Z"
+        now = time.time_ns()
 
         with self._connection() as conn:
             cursor = conn.execute(
-                """
-                INSERT INTO artifacts 
-                (session_id, message_id, file_path, operation, content_before, content_after, diff, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
+                _INSERT_ARTIFACT_SQL,
+                _artifact_row(
                     session_id,
                     message_id,
                     file_path,
@@ -256,25 +635,59 @@ class Database:
             )
             return cursor.lastrowid
 
+    def add_artifacts_bulk(
+        self, session_id: str, artifacts: list[dict[str, Any]]
+    ) -> int:
+        """
+        Record several file artifacts in a single transaction.
+
+        Args:
+            session_id: Session the artifacts belong to
+            artifacts: Dicts with file_path and operation, plus optional
+                content_before, content_after, diff, message_id, and
+                created_at (time_ns; defaults to now)
+
+        Returns:
+            Number of artifacts inserted.
+        """
+        if not artifacts:
+            return 0
+
+        now = time.time_ns()
+        rows = [
+            _artifact_row(
+                session_id,
+                a.get("message_id"),
+                a["file_path"],
+                a["operation"],
+                a.get("content_before"),
+                a.get("content_after"),
+                a.get("diff"),
+                a.get("created_at", now),
+            )
+            for a in artifacts
+        ]
+
+        with self._connection() as conn:
+            conn.executemany(_INSERT_ARTIFACT_SQL, rows)
+        return len(rows)
+
     def get_artifacts(self, session_id: str) -> list[dict[str, Any]]:
         """Get all artifacts for a session."""
         with self._connection() as conn:
-            rows = conn.execute(
-                """
-                SELECT * FROM artifacts
-                WHERE session_id = ?
-                ORDER BY id ASC
-                """,
-                (session_id,),
-            ).fetchall()
+            rows = conn.execute(_SELECT_ARTIFACTS_SQL, (session_id,)).fetchall()
             return [dict(row) for row in rows]
 
+    def get_artifacts_json(self, session_id: str) -> str:
+        """Get all artifacts for a session as a JSON array string."""
+        with self._connection() as conn:
+            row = conn.execute(_SELECT_ARTIFACTS_JSON_SQL, (session_id,)).fetchone()
+            return row[0]
+
     def get_artifact(self, artifact_id: int) -> dict[str, Any] | None:
         """Get a specific artifact by ID."""
         with self._connection() as conn:
-            row = conn.execute(
-                "SELECT * FROM artifacts WHERE id = ?", (artifact_id,)
-            ).fetchone()
+            row = conn.execute(_SELECT_ARTIFACT_SQL, (artifact_id,)).fetchone()
             if row:
                 return dict(row)
         return None
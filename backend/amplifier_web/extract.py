@@ -7,17 +7,85 @@ in LLM context as text content.
 
 from __future__ import annotations
 
-import base64
+import asyncio
+import codecs
 import io
 import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any
 
+# Optional extractors, imported once (this module is itself imported lazily
+# by the /api/extract endpoint, so the import cost is paid on first use)
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    from docx import Document
+except ImportError:
+    Document = None
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+try:
+    from pybase64 import b64decode  # SIMD-accelerated
+except ImportError:
+    from base64 import b64decode
+
 logger = logging.getLogger(__name__)
 
+# PDF/DOCX parsing is CPU-bound, so it runs in worker processes to keep the
+# event loop (and every other session's WebSocket) responsive
+_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# Base64 payloads longer than this are decoded in a worker thread
+_INLINE_B64_MAX = 64 * 1024
+
+# Byte-order marks that identify a text file's encoding outright
+_TEXT_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Pages extracted by the first PDF task; longer documents have the remaining
+# pages split evenly across the workers
+_PDF_FIRST_TASK_PAGES = 8
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Get the shared extraction process pool, starting it on first use."""
+    global _executor
+    if _executor is None:
+        # Spawned, not forked: forking the multi-threaded server process can
+        # copy locks held by other threads into the children
+        _executor = ProcessPoolExecutor(
+            max_workers=_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the extraction process pool (restarted on next use)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
 
 async def extract_text(filename: str, content_b64: str) -> dict[str, Any]:
     """
-    Extract text from a file based on its type.
+    Extract text from a base64-encoded file based on its type.
 
     Args:
         filename: Original filename (used to determine type)
@@ -30,81 +98,163 @@ async def extract_text(filename: str, content_b64: str) -> dict[str, Any]:
         return {"error": "No content provided"}
 
     try:
-        file_bytes = base64.b64decode(content_b64)
+        if len(content_b64) > _INLINE_B64_MAX:
+            file_bytes = await asyncio.to_thread(b64decode, content_b64)
+        else:
+            file_bytes = b64decode(content_b64)
     except Exception as e:
         return {"error": f"Invalid base64 content: {e}"}
 
-    filename_lower = filename.lower()
+    return await extract_bytes(filename, file_bytes)
+
+
+async def extract_bytes(filename: str, file_bytes: bytes) -> dict[str, Any]:
+    """
+    Extract text from raw file bytes based on the file's type.
+
+    Args:
+        filename: Original filename (used to determine type)
+        file_bytes: File content
+
+    Returns:
+        Dict with either "text" (extracted content) or "error" (failure message)
+    """
+    if not file_bytes:
+        return {"error": "No content provided"}
+
+    extractor = _EXTRACTORS.get(_suffix(filename))
+    if extractor is None:
+        return {"error": f"Unsupported file type: {filename}"}
 
     try:
-        if filename_lower.endswith(".pdf"):
-            return await _extract_pdf(file_bytes, filename)
-        elif filename_lower.endswith(".docx"):
-            return await _extract_docx(file_bytes, filename)
-        elif filename_lower.endswith(".txt") or filename_lower.endswith(".md"):
-            return await _extract_text_file(file_bytes, filename)
-        else:
-            return {"error": f"Unsupported file type: {filename}"}
+        return await extractor(file_bytes, filename)
 
     except Exception as e:
         logger.exception(f"Failed to extract text from {filename}")
         return {"error": f"Extraction failed: {e}"}
 
 
-async def _extract_pdf(file_bytes: bytes, filename: str) -> dict[str, Any]:
-    """Extract text from PDF using PyMuPDF."""
-    try:
-        import fitz  # PyMuPDF
-    except ImportError:
-        return {"error": "PDF extraction not available (PyMuPDF not installed)"}
+def _write_temp_pdf(file_bytes: bytes) -> str:
+    """Write an uploaded PDF to a temporary file and return its path."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(file_bytes)
+        return f.name
 
-    try:
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        text_parts = []
 
-        for page_num, page in enumerate(doc, 1):
-            page_text = page.get_text()
+def _extract_pdf_pages(path: str, start: int, stop: int) -> tuple[int, int, str]:
+    """
+    Extract text from pages [start, stop) of a PDF (runs in a worker process).
+
+    The document is opened from path, so only the path (not the file
+    content) is sent to the worker. Pages are written straight into one
+    buffer, so a single string (rather than a list of per-page strings) is
+    built and sent back to the caller.
+
+    Returns:
+        Tuple of (total page count, number of non-empty pages, their text)
+    """
+    buf = io.StringIO()
+    text_pages = 0
+    with fitz.open(path, filetype="pdf") as doc:
+        for page_num in range(start, min(stop, doc.page_count)):
+            page_text = doc[page_num].get_text()
             if page_text.strip():
-                text_parts.append(f"--- Page {page_num} ---\n{page_text}")
+                if text_pages:
+                    buf.write("\n\n")
+                buf.write(f"--- Page {page_num + 1} ---\n")
+                buf.write(page_text)
+                text_pages += 1
+        return doc.page_count, text_pages, buf.getvalue()
 
-        doc.close()
 
-        if not text_parts:
+async def _extract_pdf(file_bytes: bytes, filename: str) -> dict[str, Any]:
+    """Extract text from PDF using PyMuPDF."""
+    if fitz is None:
+        return {"error": "PDF extraction not available (PyMuPDF not installed)"}
+
+    path = None
+    try:
+        # Written once for all the page-range tasks rather than pickled into
+        # each of them
+        path = await asyncio.to_thread(_write_temp_pdf, file_bytes)
+        loop = asyncio.get_running_loop()
+        executor = _get_executor()
+
+        # The first task also reports the page count, so short documents
+        # are handled in a single round trip
+        page_count, text_pages, text = await loop.run_in_executor(
+            executor, _extract_pdf_pages, path, 0, _PDF_FIRST_TASK_PAGES
+        )
+
+        if page_count > _PDF_FIRST_TASK_PAGES:
+            remaining = page_count - _PDF_FIRST_TASK_PAGES
+            chunk = -(-remaining // _MAX_WORKERS)  # ceil division
+            results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor, _extract_pdf_pages, path, start, start + chunk
+                    )
+                    for start in range(_PDF_FIRST_TASK_PAGES, page_count, chunk)
+                )
+            )
+            chunk_texts = [text] if text_pages else []
+            for _, chunk_pages, chunk_text in results:
+                if chunk_pages:
+                    text_pages += chunk_pages
+                    chunk_texts.append(chunk_text)
+            text = "\n\n".join(chunk_texts)
+
+        if not text_pages:
             return {
                 "text": "[PDF contains no extractable text - may be scanned/image-based]",
                 "warning": "No text found in PDF",
             }
 
         return {
-            "text": "\n\n".join(text_parts),
-            "pages": len(text_parts),
+            "text": text,
+            "pages": text_pages,
         }
 
     except Exception as e:
         return {"error": f"PDF extraction failed: {e}"}
 
+    finally:
+        if path is not None:
+            try:
+                os.unlink(path)
+            except OSError as e:
+                logger.warning(f"Could not remove temporary PDF {path}: {e}")
+
+
+def _extract_docx_parts(file_bytes: bytes) -> list[str]:
+    """Extract paragraph and table text from a DOCX (runs in a worker process)."""
+    doc = Document(io.BytesIO(file_bytes))
+    text_parts = []
+
+    for para in doc.paragraphs:
+        if para.text.strip():
+            text_parts.append(para.text)
+
+    # Also extract text from tables
+    for table in doc.tables:
+        for row in table.rows:
+            row_text = " | ".join(cell.text.strip() for cell in row.cells)
+            if row_text.strip():
+                text_parts.append(row_text)
+
+    return text_parts
+
 
 async def _extract_docx(file_bytes: bytes, filename: str) -> dict[str, Any]:
     """Extract text from DOCX using python-docx."""
-    try:
-        from docx import Document
-    except ImportError:
+    if Document is None:
         return {"error": "DOCX extraction not available (python-docx not installed)"}
 
     try:
-        doc = Document(io.BytesIO(file_bytes))
-        text_parts = []
-
-        for para in doc.paragraphs:
-            if para.text.strip():
-                text_parts.append(para.text)
-
-        # Also extract text from tables
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = " | ".join(cell.text.strip() for cell in row.cells)
-                if row_text.strip():
-                    text_parts.append(row_text)
+        loop = asyncio.get_running_loop()
+        text_parts = await loop.run_in_executor(
+            _get_executor(), _extract_docx_parts, file_bytes
+        )
 
         if not text_parts:
             return {
@@ -120,8 +270,23 @@ async def _extract_docx(file_bytes: bytes, filename: str) -> dict[str, Any]:
 
 async def _extract_text_file(file_bytes: bytes, filename: str) -> dict[str, Any]:
     """Extract text from plain text files."""
+    for bom, encoding in _TEXT_BOMS:
+        if file_bytes.startswith(bom):
+            return {"text": file_bytes.decode(encoding, errors="replace")}
+
+    # Almost all uploads are UTF-8, which a single strict decode confirms
+    try:
+        return {"text": file_bytes.decode("utf-8")}
+    except UnicodeDecodeError:
+        pass
+
+    if charset_normalizer is not None:
+        best = charset_normalizer.from_bytes(file_bytes).best()
+        if best is not None:
+            return {"text": str(best)}
+
     # Try common encodings
-    for encoding in ["utf-8", "utf-16", "latin-1", "cp1252"]:
+    for encoding in ["utf-16", "latin-1", "cp1252"]:
         try:
             text = file_bytes.decode(encoding)
             return {"text": text}
@@ -148,19 +313,28 @@ IMAGE_TYPES = {
 }
 
 
+# Extractor for each entry in SUPPORTED_TYPES
+_EXTRACTORS = {
+    ".pdf": _extract_pdf,
+    ".docx": _extract_docx,
+    ".txt": _extract_text_file,
+    ".md": _extract_text_file,
+}
+
+
+def _suffix(filename: str) -> str:
+    """Get a filename's lowercased extension, including the dot."""
+    return os.path.splitext(filename)[1].lower()
+
+
 def get_file_type(filename: str) -> str | None:
     """Get the MIME type for an image file, or None if not an image."""
-    filename_lower = filename.lower()
-    for ext, mime_type in IMAGE_TYPES.items():
-        if filename_lower.endswith(ext):
-            return mime_type
-    return None
+    return IMAGE_TYPES.get(_suffix(filename))
 
 
 def is_supported_document(filename: str) -> bool:
     """Check if a filename is a supported document type."""
-    filename_lower = filename.lower()
-    return any(filename_lower.endswith(ext) for ext in SUPPORTED_TYPES)
+    return _suffix(filename) in SUPPORTED_TYPES
 
 
 def is_image(filename: str) -> bool:
@@ -0,0 +1,62 @@
+"""
+JSON encoding helpers for Amplifier Web.
+
+Uses orjson (C-native, roughly 2-6x faster than stdlib json) when installed,
+falling back to the stdlib json module otherwise. Output is always compact
+(no spaces after separators).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None  # type: ignore[assignment]
+
+HAS_ORJSON = orjson is not None
+
+
+def dumps(obj: Any, *, indent: bool = False) -> str:
+    """
+    Serialize obj to a JSON string.
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with two-space indentation instead of the
+            default compact output
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option).decode()
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 encoded JSON (e.g. for HTTP bodies)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse a JSON document from str or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+async def send_json(websocket: Any, data: Any) -> None:
+    """
+    Send data over a WebSocket as a JSON text frame.
+
+    Drop-in for Starlette's WebSocket.send_json (same compact text output,
+    so clients are unaffected) that encodes with dumps().
+    """
+    await websocket.send_text(dumps(data))
@@ -9,7 +9,10 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+from collections.abc import Awaitable, Callable
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -20,16 +23,21 @@ from fastapi import (
     HTTPException,
     Query,
     Request,
+    Response,
+    UploadFile,
     status,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
-from .auth import AuthDep, verify_websocket_token, get_or_create_token
+from .auth import AuthDep, init_auth, verify_websocket_token
+from .batching import BatchingSender
+from . import json_utils
 from .bundle_manager import BundleManager
 from .security import validate_session_cwd
 from .session_manager import SessionManager
+from .static import PrecompressedStaticFiles
 
 # Configure logging
 logging.basicConfig(
@@ -37,6 +45,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Source layout, resolved once at import: backend/amplifier_web/ is the
+# package (and the dev reload dir), frontend/dist/ holds the built frontend
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_REPO_ROOT = os.path.dirname(os.path.dirname(_PACKAGE_DIR))
+_FRONTEND_DIST_DIR = os.path.join(_REPO_ROOT, "frontend", "dist")
+
 # Global managers (initialized on startup)
 bundle_manager: BundleManager | None = None
 session_manager: SessionManager | None = None
@@ -47,18 +61,19 @@ async def lifespan(app: FastAPI):
     """Application lifespan - initialize and cleanup managers."""
     global bundle_manager, session_manager
 
+    # Resolve the auth token once, off the event loop
+    await init_auth(app)
+
     # Determine modules directory (check for submodules)
     # Look for workspace-style layout where submodules are siblings of amplifier-web
     # e.g., amplifier-web-project/amplifier-foundation, amplifier-web-project/amplifier-core
-    workspace_root = Path(
-        __file__
-    ).parent.parent.parent.parent  # Go up to workspace root
+    workspace_root = Path(_REPO_ROOT).parent  # Go up to workspace root
     if (workspace_root / "amplifier-foundation").exists():
         modules_dir = workspace_root
         logger.info(f"Using workspace submodules from {modules_dir}")
     else:
         # Fallback: check for modules/ subdirectory (legacy layout)
-        modules_dir = Path(__file__).parent.parent.parent / "modules"
+        modules_dir = Path(_REPO_ROOT, "modules")
         if not modules_dir.exists():
             modules_dir = None
             logger.info("Submodules not found, will use installed packages")
@@ -77,6 +92,17 @@ async def lifespan(app: FastAPI):
     # Cleanup
     logger.info("Amplifier Web shutting down")
 
+    from .extract import shutdown_executor
+
+    shutdown_executor()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered via json_utils (orjson when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return json_utils.dumps_bytes(content)
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -84,10 +110,11 @@ app = FastAPI(
     description="Web interface for Microsoft Amplifier AI agent system",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 
-def get_allowed_origins() -> list[str]:
+def get_allowed_origins() -> tuple[str, ...]:
     """
     Get allowed CORS origins from environment or use secure defaults.
 
@@ -96,30 +123,35 @@ def get_allowed_origins() -> list[str]:
     Example: "http://localhost:3000,http://localhost:5173"
 
     Returns:
-        List of allowed origin URLs
+        Tuple of allowed origin URLs
     """
-    env_origins = os.environ.get("AMPLIFIER_WEB_ALLOWED_ORIGINS", "")
+    return _parse_allowed_origins(os.environ.get("AMPLIFIER_WEB_ALLOWED_ORIGINS", ""))
+
+
+@lru_cache(maxsize=8)
+def _parse_allowed_origins(env_origins: str) -> tuple[str, ...]:
+    """Parse the origins env value (cached per value, so it's logged once)."""
     if env_origins:
         # Parse comma-separated list, strip whitespace, and reject wildcards
-        origins = [
+        origins = tuple(
             origin.strip()
             for origin in env_origins.split(",")
             if origin.strip() and origin.strip() != "*"
-        ]
+        )
         if origins:
-            logger.info(f"Using CORS origins from environment: {origins}")
+            logger.info(f"Using CORS origins from environment: {list(origins)}")
             return origins
         # If only wildcards were specified, fall through to defaults
         logger.warning("CORS wildcard (*) rejected, using secure defaults")
 
     # Secure defaults for local development
-    default_origins = [
+    default_origins = (
         "http://localhost:4100",
         "http://localhost:4000",
         "http://127.0.0.1:4100",
         "http://127.0.0.1:4000",
-    ]
-    logger.info(f"Using default CORS origins: {default_origins}")
+    )
+    logger.info(f"Using default CORS origins: {list(default_origins)}")
     return default_origins
 
 
@@ -211,8 +243,7 @@ async def get_local_token(request: Request):
             detail="Token auto-fetch only available for localhost connections",
         )
 
-    token = get_or_create_token()
-    return {"token": token}
+    return {"token": request.app.state.auth_token}
 
 
 @app.get("/api/auth/verify")
@@ -479,13 +510,13 @@ async def list_behaviors(_: AuthDep):
 
     # Add custom behaviors from preferences
     prefs = load_preferences()
-    for custom in prefs.custom_behaviors:
+    for uri, custom in prefs.custom_behaviors.items():
         behaviors.append(
             {
                 "name": custom.get("name", "unknown"),
                 "description": custom.get("description", ""),
                 "is_custom": True,
-                "uri": custom.get("uri"),
+                "uri": uri,
             }
         )
 
@@ -531,7 +562,9 @@ async def remove_custom_behavior(name: str, _: AuthDep):
     prefs = load_preferences()
 
     # Check if behavior exists
-    exists = any(b.get("name") == name for b in prefs.custom_behaviors)
+    exists = any(
+        b.get("name") == name for b in prefs.custom_behaviors.values()
+    )
     if not exists:
         raise HTTPException(status_code=404, detail=f"Behavior '{name}' not found")
 
@@ -569,6 +602,24 @@ async def extract_file(request: ExtractRequest, _: AuthDep):
     return result
 
 
+@app.post("/api/extract/upload")
+async def extract_uploaded_file(file: UploadFile, _: AuthDep):
+    """
+    Extract text from a file sent as multipart/form-data.
+
+    Preferred over /api/extract: the raw bytes skip base64 encoding on the
+    wire (~33% smaller) and the decode pass on the server.
+    """
+    from .extract import extract_bytes
+
+    result = await extract_bytes(file.filename or "", await file.read())
+
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    return result
+
+
 @app.get("/api/extract/supported")
 async def get_supported_types(_: AuthDep):
     """Get list of supported file types for extraction and images."""
@@ -636,9 +687,15 @@ async def get_session_artifacts(session_id: str, _: AuthDep):
     """Get all file artifacts for a session."""
     from .database import get_database
 
-    db = get_database()
-    artifacts = db.get_artifacts(session_id)
-    return {"session_id": session_id, "artifacts": artifacts}
+    # SQLite calls run in a worker thread so they don't stall the event loop.
+    # Artifacts JSON is built by SQLite; splice it in rather than re-encoding
+    db = await asyncio.to_thread(get_database)
+    artifacts_json = await asyncio.to_thread(db.get_artifacts_json, session_id)
+    session_json = json_utils.dumps(session_id)
+    return Response(
+        content=f'{{"session_id":{session_json},"artifacts":{artifacts_json}}}',
+        media_type="application/json",
+    )
 
 
 @app.get("/api/artifacts/{artifact_id}")
@@ -646,8 +703,8 @@ async def get_artifact(artifact_id: int, _: AuthDep):
     """Get a specific artifact with full diff."""
     from .database import get_database
 
-    db = get_database()
-    artifact = db.get_artifact(artifact_id)
+    db = await asyncio.to_thread(get_database)
+    artifact = await asyncio.to_thread(db.get_artifact, artifact_id)
     if not artifact:
         raise HTTPException(status_code=404, detail="Artifact not found")
     return artifact
@@ -658,6 +715,139 @@ async def get_artifact(artifact_id: int, _: AuthDep):
 # ============================================================================
 
 
+# Keep-alive frame exactly as the frontend sends it (JSON.stringify) and the
+# pre-serialized reply
+_PING_FRAME = '{"type":"ping"}'
+_PONG_JSON = json_utils.dumps({"type": "pong"})
+
+
+@dataclass
+class _Connection:
+    """Per-connection state shared by the WebSocket message handlers."""
+
+    out: BatchingSender
+    session_id: str | None = None
+    # Prompt executions running alongside the receive loop
+    tasks: set[asyncio.Task[None]] = field(default_factory=set)
+
+
+_MessageHandler = Callable[[_Connection, dict[str, Any]], Awaitable[None]]
+
+
+async def _handle_create_session(conn: _Connection, data: dict[str, Any]) -> None:
+    """Create a new session (or reconfigure/resume with history)."""
+    # Validate the config dict directly in pydantic-core rather than
+    # expanding it into keyword arguments
+    request = SessionCreateRequest.model_validate(data.get("config") or {})
+
+    # Validate session working directory
+    is_valid, error_msg, session_cwd = validate_session_cwd(request.cwd)
+    if not is_valid:
+        logger.warning("Invalid session CWD: %s", error_msg)
+        await json_utils.send_json(
+            conn.out,
+            {
+                "type": "error",
+                "error": f"Invalid working directory: {error_msg}",
+            },
+        )
+        return
+
+    # Load transcript from storage if resuming
+    initial_transcript = request.initial_transcript
+    if request.resume_session_id:
+        stored_transcript = session_manager.load_transcript(request.resume_session_id)
+        if stored_transcript:
+            initial_transcript = stored_transcript
+            logger.info(
+                "Loaded %d messages from session %s",
+                len(stored_transcript),
+                request.resume_session_id,
+            )
+
+    conn.session_id = await session_manager.create_session(
+        websocket=conn.out,
+        bundle_name=request.bundle,
+        behaviors=request.behaviors,
+        provider_config=request.provider,
+        session_id=request.resume_session_id,  # Use same ID when resuming
+        show_thinking=request.show_thinking,
+        initial_transcript=initial_transcript,
+        session_cwd=session_cwd,
+    )
+
+
+async def _handle_prompt(conn: _Connection, data: dict[str, Any]) -> None:
+    """
+    Start executing a prompt in the current session.
+
+    Execution runs as a background task so the receive loop keeps reading
+    cancel and approval_response messages meanwhile. Prompts for the same
+    session still run one at a time (session lock).
+    """
+    if not conn.session_id:
+        await json_utils.send_json(
+            conn.out, {"type": "error", "error": "No session created"}
+        )
+        return
+
+    task = asyncio.create_task(_execute_prompt(conn.session_id, data))
+    conn.tasks.add(task)
+    task.add_done_callback(conn.tasks.discard)
+
+
+async def _execute_prompt(session_id: str, data: dict[str, Any]) -> None:
+    """Run one prompt to completion; results stream via the session hooks."""
+    prompt = data.get("content", "")
+    images = data.get("images")  # List of {data, media_type}
+    attachments = data.get("attachments")  # List of {name, text}
+
+    try:
+        await session_manager.execute(session_id, prompt, images, attachments)
+    except Exception as e:
+        logger.error("Execution error: %s", e)
+        # Error already sent via execute()
+
+
+async def _handle_approval_response(conn: _Connection, data: dict[str, Any]) -> None:
+    """Resolve a pending approval request."""
+    if conn.session_id:
+        await session_manager.handle_approval_response(
+            conn.session_id, data.get("id", ""), data.get("choice", "Deny")
+        )
+
+
+async def _handle_cancel(conn: _Connection, data: dict[str, Any]) -> None:
+    """Cancel the running execution."""
+    if conn.session_id:
+        await session_manager.cancel(
+            conn.session_id, immediate=data.get("immediate", False)
+        )
+
+
+async def _handle_command(conn: _Connection, data: dict[str, Any]) -> None:
+    """Run a slash command."""
+    await handle_slash_command(
+        conn.out, conn.session_id, data.get("name", ""), data.get("args", [])
+    )
+
+
+async def _handle_ping(conn: _Connection, data: dict[str, Any]) -> None:
+    """Answer a keep-alive ping."""
+    await conn.out.send_text(_PONG_JSON)
+
+
+# Client message type -> handler
+_MESSAGE_HANDLERS: dict[str, _MessageHandler] = {
+    "create_session": _handle_create_session,
+    "prompt": _handle_prompt,
+    "approval_response": _handle_approval_response,
+    "cancel": _handle_cancel,
+    "command": _handle_command,
+    "ping": _handle_ping,
+}
+
+
 @app.websocket("/ws/session")
 async def websocket_session(websocket: WebSocket):
     """
@@ -688,253 +878,245 @@ async def websocket_session(websocket: WebSocket):
 
     # Wait for authentication message with timeout
     try:
-        auth_data = await asyncio.wait_for(websocket.receive_json(), timeout=5.0)
+        auth_data = json_utils.loads(
+            await asyncio.wait_for(websocket.receive_text(), timeout=5.0)
+        )
     except asyncio.TimeoutError:
         logger.warning("WebSocket authentication timeout")
         await websocket.close(code=4001, reason="Authentication timeout")
         return
     except Exception as e:
-        logger.error(f"WebSocket authentication error: {e}")
+        logger.error("WebSocket authentication error: %s", e)
         await websocket.close(code=4001, reason="Authentication failed")
         return
 
     # Verify auth message format and token
     if auth_data.get("type") != "auth":
-        logger.warning(f"Invalid auth message type: {auth_data.get('type')}")
+        logger.warning("Invalid auth message type: %s", auth_data.get("type"))
         await websocket.close(code=4001, reason="Invalid auth message")
         return
 
     token = auth_data.get("token")
-    if not token or not verify_websocket_token(token):
+    expected_token = websocket.app.state.auth_token
+    if not token or not verify_websocket_token(token, expected_token):
         logger.warning("Invalid or missing auth token")
         await websocket.close(code=4001, reason="Invalid or missing auth token")
         return
 
     # Authentication successful
     logger.info("WebSocket authentication successful")
-    await websocket.send_json({"type": "auth_success"})
+    await json_utils.send_json(websocket, {"type": "auth_success"})
 
-    session_id: str | None = None
+    # Everything sent from here on goes through one coalescing sender, so
+    # bursts of small streaming messages share frames and stay in order
+    conn = _Connection(out=BatchingSender(websocket))
 
     try:
         while True:
             # Receive message from client
-            data = await websocket.receive_json()
-            msg_type = data.get("type")
+            raw = await websocket.receive_text()
 
-            if msg_type == "create_session":
-                # Create new session (or reconfigure/resume with history)
-                request = SessionCreateRequest(**data.get("config", {}))
+            # Keep-alives are the most frequent message; answer them
+            # without a JSON parse or handler lookup
+            if raw == _PING_FRAME:
+                await conn.out.send_text(_PONG_JSON)
+                continue
 
-                # Validate session working directory
-                is_valid, error_msg, session_cwd = validate_session_cwd(request.cwd)
-                if not is_valid:
-                    logger.warning(f"Invalid session CWD: {error_msg}")
-                    await websocket.send_json(
-                        {
-                            "type": "error",
-                            "error": f"Invalid working directory: {error_msg}",
-                        }
-                    )
-                    continue
-
-                # Load transcript from storage if resuming
-                initial_transcript = request.initial_transcript
-                if request.resume_session_id:
-                    stored_transcript = session_manager.load_transcript(
-                        request.resume_session_id
-                    )
-                    if stored_transcript:
-                        initial_transcript = stored_transcript
-                        logger.info(
-                            f"Loaded {len(stored_transcript)} messages from session {request.resume_session_id}"
-                        )
-
-                session_id = await session_manager.create_session(
-                    websocket=websocket,
-                    bundle_name=request.bundle,
-                    behaviors=request.behaviors,
-                    provider_config=request.provider,
-                    session_id=request.resume_session_id,  # Use same ID when resuming
-                    show_thinking=request.show_thinking,
-                    initial_transcript=initial_transcript,
-                    session_cwd=session_cwd,
-                )
-
-            elif msg_type == "prompt":
-                # Execute prompt
-                if not session_id:
-                    await websocket.send_json(
-                        {"type": "error", "error": "No session created"}
-                    )
-                    continue
-
-                prompt = data.get("content", "")
-                images = data.get("images")  # List of {data, media_type}
-                attachments = data.get("attachments")  # List of {name, text}
-
-                try:
-                    await session_manager.execute(
-                        session_id, prompt, images, attachments
-                    )
-                except Exception as e:
-                    logger.error(f"Execution error: {e}")
-                    # Error already sent via execute()
-
-            elif msg_type == "approval_response":
-                # Handle approval response
-                if session_id:
-                    await session_manager.handle_approval_response(
-                        session_id, data.get("id", ""), data.get("choice", "Deny")
-                    )
-
-            elif msg_type == "cancel":
-                # Cancel execution
-                if session_id:
-                    await session_manager.cancel(
-                        session_id, immediate=data.get("immediate", False)
-                    )
-
-            elif msg_type == "command":
-                # Handle slash command
-                await handle_slash_command(
-                    websocket, session_id, data.get("name", ""), data.get("args", [])
-                )
-
-            elif msg_type == "ping":
-                # Keep-alive
-                await websocket.send_json({"type": "pong"})
+            data = json_utils.loads(raw)
+            msg_type = data.get("type")
 
-            else:
-                logger.warning(f"Unknown message type: {msg_type}")
+            handler = _MESSAGE_HANDLERS.get(msg_type)
+            if handler is None:
+                logger.warning("Unknown message type: %s", msg_type)
+                continue
+            await handler(conn, data)
 
     except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected for session {session_id}")
+        logger.info("WebSocket disconnected for session %s", conn.session_id)
 
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
         try:
-            await websocket.send_json({"type": "error", "error": str(e)})
+            await json_utils.send_json(conn.out, {"type": "error", "error": str(e)})
         except Exception:
             pass
 
     finally:
+        # Stop any prompt still running for this connection
+        for task in conn.tasks:
+            task.cancel()
+        await asyncio.gather(*conn.tasks, return_exceptions=True)
+
         # Cleanup session
-        if session_id and session_manager:
-            await session_manager.close_session(session_id)
+        if conn.session_id and session_manager:
+            await session_manager.close_session(conn.session_id)
+        await conn.out.close()
+
+
+# Static slash command replies, serialized once at import
+_HELP_RESULT_JSON = json_utils.dumps(
+    {
+        "type": "command_result",
+        "command": "help",
+        "result": {
+            "commands": [
+                {"name": "help", "description": "Show available commands"},
+                {"name": "status", "description": "Show session status"},
+                {"name": "tools", "description": "List available tools"},
+                {"name": "agents", "description": "List available agents"},
+                {"name": "clear", "description": "Clear conversation context"},
+                {"name": "mode", "description": "Set execution mode"},
+                {"name": "modes", "description": "List available modes"},
+            ]
+        },
+    }
+)
+
+_NO_SESSION_RESULT_JSON = {
+    command: json_utils.dumps(
+        {
+            "type": "command_result",
+            "command": command,
+            "result": {"error": "No active session"},
+        }
+    )
+    for command in ("status", "tools")
+}
+
+_CLEAR_RESULT_JSON = json_utils.dumps(
+    {
+        "type": "command_result",
+        "command": "clear",
+        "result": {"message": "Context cleared"},
+    }
+)
 
 
 async def handle_slash_command(
-    websocket: WebSocket, session_id: str | None, command: str, args: list[str]
+    websocket: BatchingSender, session_id: str | None, command: str, args: list[str]
 ) -> None:
     """
     Handle slash commands from the web interface.
 
     Args:
-        websocket: WebSocket connection
+        websocket: Batching sender for the WebSocket connection
         session_id: Current session ID
         command: Command name (without /)
         args: Command arguments
     """
-    if command == "help":
-        await websocket.send_json(
+    handler = _COMMAND_HANDLERS.get(command)
+    if handler is None:
+        await json_utils.send_json(
+            websocket,
             {
                 "type": "command_result",
-                "command": "help",
-                "result": {
-                    "commands": [
-                        {"name": "help", "description": "Show available commands"},
-                        {"name": "status", "description": "Show session status"},
-                        {"name": "tools", "description": "List available tools"},
-                        {"name": "agents", "description": "List available agents"},
-                        {"name": "clear", "description": "Clear conversation context"},
-                        {"name": "mode", "description": "Set execution mode"},
-                        {"name": "modes", "description": "List available modes"},
-                    ]
-                },
-            }
+                "command": command,
+                "result": {"error": f"Unknown command: {command}"},
+            },
         )
+        return
+    await handler(websocket, session_id, args)
+
+
+async def _command_help(
+    websocket: BatchingSender, session_id: str | None, args: list[str]
+) -> None:
+    """List available commands."""
+    await websocket.send_text(_HELP_RESULT_JSON)
+
 
-    elif command == "status":
-        if session_id and session_manager:
-            session = session_manager.get_session(session_id)
-            if session:
-                await websocket.send_json(
+async def _command_status(
+    websocket: BatchingSender, session_id: str | None, args: list[str]
+) -> None:
+    """Show session status."""
+    if session_id and session_manager:
+        session = session_manager.get_session(session_id)
+        if session:
+            if session.status_result_parts is None:
+                # Everything but the turn count is fixed for the session, so
+                # serialize it once and splice the count in per call
+                fixed = json_utils.dumps(
                     {
                         "type": "command_result",
                         "command": "status",
                         "result": {
                             "session_id": session.metadata.session_id,
                             "bundle": session.metadata.bundle_name,
-                            "turns": session.metadata.turn_count,
                             "created": session.metadata.created_at.isoformat(),
                         },
                     }
                 )
-                return
+                session.status_result_parts = (fixed[:-2] + ',"turns":', "}}")
+            prefix, suffix = session.status_result_parts
+            await websocket.send_text(f"{prefix}{session.metadata.turn_count}{suffix}")
+            return
 
-        await websocket.send_json(
-            {
-                "type": "command_result",
-                "command": "status",
-                "result": {"error": "No active session"},
-            }
-        )
+    await websocket.send_text(_NO_SESSION_RESULT_JSON["status"])
 
-    elif command == "tools":
-        if session_id and session_manager:
-            session = session_manager.get_session(session_id)
-            if session:
-                tools = session.prepared.mount_plan.get("tools", [])
-                await websocket.send_json(
-                    {
-                        "type": "command_result",
-                        "command": "tools",
-                        "result": {
-                            "tools": [
-                                {"module": t.get("module", "unknown")} for t in tools
-                            ]
-                        },
-                    }
+
+async def _command_tools(
+    websocket: BatchingSender, session_id: str | None, args: list[str]
+) -> None:
+    """List the tools mounted in the session."""
+    if session_id and session_manager:
+        session = session_manager.get_session(session_id)
+        if session:
+            tools = session.prepared.mount_plan.get("tools", [])
+            cached = session.tools_result_json
+            if cached is None or cached[0] is not tools:
+                cached = session.tools_result_json = (
+                    tools,
+                    json_utils.dumps(
+                        {
+                            "type": "command_result",
+                            "command": "tools",
+                            "result": {
+                                "tools": [
+                                    {"module": t.get("module", "unknown")}
+                                    for t in tools
+                                ]
+                            },
+                        }
+                    ),
                 )
-                return
+            await websocket.send_text(cached[1])
+            return
 
-        await websocket.send_json(
-            {
-                "type": "command_result",
-                "command": "tools",
-                "result": {"error": "No active session"},
-            }
-        )
+    await websocket.send_text(_NO_SESSION_RESULT_JSON["tools"])
 
-    elif command == "clear":
-        # Clear context would need AmplifierSession integration
-        await websocket.send_json(
-            {
-                "type": "command_result",
-                "command": "clear",
-                "result": {"message": "Context cleared"},
-            }
-        )
 
-    else:
-        await websocket.send_json(
-            {
-                "type": "command_result",
-                "command": command,
-                "result": {"error": f"Unknown command: {command}"},
-            }
-        )
+async def _command_clear(
+    websocket: BatchingSender, session_id: str | None, args: list[str]
+) -> None:
+    """Clear conversation context."""
+    # Clear context would need AmplifierSession integration
+    await websocket.send_text(_CLEAR_RESULT_JSON)
+
+
+# Slash command name -> handler
+_CommandHandler = Callable[[BatchingSender, str | None, list[str]], Awaitable[None]]
+_COMMAND_HANDLERS: dict[str, _CommandHandler] = {
+    "help": _command_help,
+    "status": _command_status,
+    "tools": _command_tools,
+    "clear": _command_clear,
+}
 
 
 # ============================================================================
 # Static Files (Frontend)
 # ============================================================================
 
-# Mount frontend static files if they exist
-frontend_dir = Path(__file__).parent.parent.parent / "frontend" / "dist"
-if frontend_dir.exists():
-    app.mount("/", StaticFiles(directory=str(frontend_dir), html=True), name="frontend")
+# Mount frontend static files if they exist, unless a reverse proxy serves
+# them (AMPLIFIER_SERVE_STATIC=0)
+if os.environ.get("AMPLIFIER_SERVE_STATIC", "1") == "1" and os.path.isdir(
+    _FRONTEND_DIST_DIR
+):
+    app.mount(
+        "/",
+        PrecompressedStaticFiles(directory=_FRONTEND_DIST_DIR, html=True),
+        name="frontend",
+    )
 
 
 # ============================================================================
@@ -946,6 +1128,7 @@ def main():
     """Run the server."""
     import uvicorn
     from .auth import get_or_create_token
+    from .cli import server_impls
 
     host = os.environ.get("HOST", "127.0.0.1")
     port = int(os.environ.get("PORT", "4000"))
@@ -962,15 +1145,15 @@ def main():
 
     # Only watch backend source directory for reload, exclude everything else
     # This prevents the server from reloading when the orchestrator writes files
-    backend_dir = Path(__file__).parent
-
     uvicorn.run(
         "amplifier_web.main:app",
         host=host,
         port=port,
         reload=True,
-        reload_dirs=[str(backend_dir)],  # Only watch backend source
+        reload_dirs=[_PACKAGE_DIR],  # Only watch backend source
         log_level="info",
+        ws_per_message_deflate=False,
+        **server_impls(),
     )
 
 
@@ -7,11 +7,13 @@ Single-user model: the whole ~/.amplifier/ belongs to whoever runs the server.
 
 from __future__ import annotations
 
-import json
+import copy
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from typing import Any
 
+from . import json_utils
+
 # Preferences storage location
 PREFS_DIR = Path.home() / ".amplifier"
 PREFS_FILE = PREFS_DIR / "web-preferences.json"
@@ -36,38 +38,97 @@ class UserPreferences:
     default_cwd: str | None = None
 
     # Custom bundles registered by the user
-    # List of dicts with uri, name, description
-    custom_bundles: list[dict[str, str]] = field(default_factory=list)
+    # Maps uri to a dict with name, description
+    custom_bundles: dict[str, dict[str, str]] = field(default_factory=dict)
 
     # Custom behaviors registered by the user
-    # List of dicts with uri, name, description
-    custom_behaviors: list[dict[str, str]] = field(default_factory=list)
+    # Maps uri to a dict with name, description
+    custom_behaviors: dict[str, dict[str, str]] = field(default_factory=dict)
+
+
+# Last loaded/saved preferences and the (mtime_ns, size) of the file they
+# came from; reused until the file changes on disk
+_cached_prefs: UserPreferences | None = None
+_cached_stat: tuple[int, int] | None = None
 
 
 def load_preferences() -> UserPreferences:
     """
     Load user preferences from file.
 
+    The parsed file is cached in-process and only re-read when its mtime or
+    size changes. Callers get their own copy, so they may mutate it freely.
+
     Returns:
         UserPreferences instance (with defaults if file doesn't exist).
     """
-    if not PREFS_FILE.exists():
+    global _cached_prefs, _cached_stat
+
+    try:
+        st = PREFS_FILE.stat()
+    except OSError:
         return UserPreferences()
 
+    key = (st.st_mtime_ns, st.st_size)
+    if _cached_prefs is None or _cached_stat != key:
+        _cached_prefs = _read_preferences()
+        _cached_stat = key
+    return copy.deepcopy(_cached_prefs)
+
+
+def _read_preferences() -> UserPreferences:
+    """Read and parse the preferences file (defaults if unreadable)."""
     try:
-        data = json.loads(PREFS_FILE.read_text())
+        data = json_utils.loads(PREFS_FILE.read_bytes())
+        if not isinstance(data, dict):
+            return UserPreferences()
         return UserPreferences(
             default_bundle=data.get("default_bundle", "foundation"),
             default_behaviors=data.get("default_behaviors", []),
             show_thinking=data.get("show_thinking", True),
             default_cwd=data.get("default_cwd"),
-            custom_bundles=data.get("custom_bundles", []),
-            custom_behaviors=data.get("custom_behaviors", []),
+            custom_bundles=_keyed_by_uri(data.get("custom_bundles", {})),
+            custom_behaviors=_keyed_by_uri(data.get("custom_behaviors", {})),
         )
-    except (json.JSONDecodeError, KeyError):
+    except (OSError, ValueError, KeyError):  # ValueError covers JSON errors
         return UserPreferences()
 
 
+def _keyed_by_uri(entries: Any) -> dict[str, dict[str, str]]:
+    """
+    Normalize custom bundle/behavior entries to a uri-keyed dict.
+
+    Older preference files stored a list of {uri, name, description} dicts;
+    those are converted here and written back in the new shape on next save.
+    Anything malformed (a null or scalar value, non-dict entries) is dropped
+    rather than failing every preferences read.
+    """
+    if isinstance(entries, dict):
+        return {
+            uri: entry
+            for uri, entry in entries.items()
+            if isinstance(uri, str) and isinstance(entry, dict)
+        }
+    if not isinstance(entries, list):
+        return {}
+    return {
+        entry["uri"]: {
+            "name": entry.get("name", ""),
+            "description": entry.get("description", ""),
+        }
+        for entry in entries
+        if isinstance(entry, dict)
+        and isinstance(entry.get("uri"), str)
+        and entry["uri"]
+    }
+
+
+def _remove_by_name(entries: dict[str, dict[str, str]], name: str) -> None:
+    """Remove every entry with the given display name, in place."""
+    for uri in [uri for uri, entry in entries.items() if entry.get("name") == name]:
+        del entries[uri]
+
+
 def save_preferences(prefs: UserPreferences) -> None:
     """
     Save user preferences to file.
@@ -75,8 +136,14 @@ def save_preferences(prefs: UserPreferences) -> None:
     Args:
         prefs: The preferences to save.
     """
+    global _cached_prefs, _cached_stat
+
     PREFS_DIR.mkdir(parents=True, exist_ok=True)
-    PREFS_FILE.write_text(json.dumps(asdict(prefs), indent=2))
+    PREFS_FILE.write_text(json_utils.dumps(asdict(prefs), indent=True))
+
+    st = PREFS_FILE.stat()
+    _cached_prefs = copy.deepcopy(prefs)
+    _cached_stat = (st.st_mtime_ns, st.st_size)
 
 
 def add_custom_bundle(uri: str, name: str, description: str = "") -> UserPreferences:
@@ -92,24 +159,7 @@ def add_custom_bundle(uri: str, name: str, description: str = "") -> UserPrefere
         Updated preferences.
     """
     prefs = load_preferences()
-
-    # Check if already exists
-    for bundle in prefs.custom_bundles:
-        if bundle.get("uri") == uri:
-            # Update existing
-            bundle["name"] = name
-            bundle["description"] = description
-            save_preferences(prefs)
-            return prefs
-
-    # Add new
-    prefs.custom_bundles.append(
-        {
-            "uri": uri,
-            "name": name,
-            "description": description,
-        }
-    )
+    prefs.custom_bundles[uri] = {"name": name, "description": description}
     save_preferences(prefs)
     return prefs
 
@@ -125,7 +175,7 @@ def remove_custom_bundle(name: str) -> UserPreferences:
         Updated preferences.
     """
     prefs = load_preferences()
-    prefs.custom_bundles = [b for b in prefs.custom_bundles if b.get("name") != name]
+    _remove_by_name(prefs.custom_bundles, name)
     save_preferences(prefs)
     return prefs
 
@@ -143,24 +193,7 @@ def add_custom_behavior(uri: str, name: str, description: str = "") -> UserPrefe
         Updated preferences.
     """
     prefs = load_preferences()
-
-    # Check if already exists
-    for behavior in prefs.custom_behaviors:
-        if behavior.get("uri") == uri:
-            # Update existing
-            behavior["name"] = name
-            behavior["description"] = description
-            save_preferences(prefs)
-            return prefs
-
-    # Add new
-    prefs.custom_behaviors.append(
-        {
-            "uri": uri,
-            "name": name,
-            "description": description,
-        }
-    )
+    prefs.custom_behaviors[uri] = {"name": name, "description": description}
     save_preferences(prefs)
     return prefs
 
@@ -176,9 +209,7 @@ def remove_custom_behavior(name: str) -> UserPreferences:
         Updated preferences.
     """
     prefs = load_preferences()
-    prefs.custom_behaviors = [
-        b for b in prefs.custom_behaviors if b.get("name") != name
-    ]
+    _remove_by_name(prefs.custom_behaviors, name)
     save_preferences(prefs)
     return prefs
 
@@ -8,15 +8,24 @@ handling user approvals via WebSocket with browser UI.
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
 import uuid
+from collections import OrderedDict
+from functools import lru_cache
 from typing import TYPE_CHECKING, Literal
 
+from .. import json_utils
+
 if TYPE_CHECKING:
     from fastapi import WebSocket
 
 logger = logging.getLogger(__name__)
 
+# Most "Allow always" decisions remembered per session (least recently used
+# are evicted first)
+MAX_CACHED_APPROVALS = 1024
+
 
 class ApprovalTimeoutError(Exception):
     """Raised when user approval times out."""
@@ -45,8 +54,14 @@ class WebApprovalSystem:
             websocket: Connected WebSocket to browser
         """
         self._websocket = websocket
-        self._pending: dict[str, asyncio.Future[str]] = {}
-        self._cache: dict[int, str] = {}  # Session-scoped approval cache
+        # request_id -> (future, loop time after which it is abandoned)
+        self._pending: dict[str, tuple[asyncio.Future[str], float]] = {}
+        # Request IDs are a per-instance counter behind a random prefix, so
+        # IDs stay unique across sessions without a urandom read per request
+        self._id_prefix = uuid.uuid4().hex[:8]
+        self._id_counter = itertools.count(1)
+        # Session-scoped approval cache, keyed on (prompt, options)
+        self._cache: OrderedDict[tuple[str, tuple[str, ...]], str] = OrderedDict()
 
     async def request_approval(
         self,
@@ -70,17 +85,22 @@ class WebApprovalSystem:
         Raises:
             ApprovalTimeoutError: If configured to raise on timeout
         """
-        # Check cache for "Allow always" decisions
-        cache_key = hash((prompt, tuple(options)))
-        if cache_key in self._cache:
-            cached = self._cache[cache_key]
-            logger.debug(f"Using cached approval: {cached}")
+        # Check cache for "Allow always" decisions. The tuple itself is the
+        # key (str hashes are cached by Python), so a hash collision can
+        # never reuse an approval for a different prompt.
+        cache_key = (prompt, tuple(options))
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Using cached approval: %s", cached)
             return cached
 
         # Generate request ID and send to browser
-        request_id = str(uuid.uuid4())
+        request_id = f"{self._id_prefix}-{next(self._id_counter)}"
         try:
-            await self._websocket.send_json(
+            await json_utils.send_json(
+                self._websocket,
                 {
                     "type": "approval_request",
                     "id": request_id,
@@ -88,16 +108,18 @@ class WebApprovalSystem:
                     "options": options,
                     "timeout": timeout,
                     "default": default,
-                }
+                },
             )
         except Exception as e:
-            logger.error(f"Failed to send approval request: {e}")
+            logger.error("Failed to send approval request: %s", e)
             # Return default on send failure
             return self._resolve_default(default, options)
 
         # Create future for response and wait with timeout
-        future: asyncio.Future[str] = asyncio.get_event_loop().create_future()
-        self._pending[request_id] = future
+        loop = asyncio.get_running_loop()
+        self._prune_pending(loop.time())
+        future: asyncio.Future[str] = loop.create_future()
+        self._pending[request_id] = (future, loop.time() + 2 * timeout)
 
         try:
             choice = await asyncio.wait_for(future, timeout)
@@ -105,22 +127,26 @@ class WebApprovalSystem:
             # Cache "always" decisions
             if "always" in choice.lower():
                 self._cache[cache_key] = choice
-                logger.debug(f"Cached 'always' approval: {choice}")
+                if len(self._cache) > MAX_CACHED_APPROVALS:
+                    self._cache.popitem(last=False)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Cached 'always' approval: %s", choice)
 
             return choice
 
         except asyncio.TimeoutError:
             logger.warning(
-                f"Approval timed out after {timeout}s, using default: {default}"
+                "Approval timed out after %ss, using default: %s", timeout, default
             )
             # Notify browser of timeout
             try:
-                await self._websocket.send_json(
+                await json_utils.send_json(
+                    self._websocket,
                     {
                         "type": "approval_timeout",
                         "id": request_id,
                         "applied_default": default,
-                    }
+                    },
                 )
             except Exception:
                 pass
@@ -142,12 +168,29 @@ class WebApprovalSystem:
         Returns:
             True if response was handled, False if request not found
         """
-        future = self._pending.get(request_id)
-        if future and not future.done():
-            future.set_result(choice)
+        entry = self._pending.get(request_id)
+        if entry and not entry[0].done():
+            entry[0].set_result(choice)
             return True
         return False
 
+    def _prune_pending(self, now: float) -> None:
+        """
+        Drop pending requests that outlived twice their timeout.
+
+        Requests normally remove themselves when they finish; this only
+        catches entries whose waiting task never got to do so.
+
+        Args:
+            now: Current event loop time
+        """
+        expired = [
+            rid for rid, (_, stale_at) in self._pending.items() if stale_at < now
+        ]
+        for request_id in expired:
+            future, _ = self._pending.pop(request_id)
+            future.cancel()
+
     def _resolve_default(
         self, default: Literal["allow", "deny"], options: list[str]
     ) -> str:
@@ -161,15 +204,19 @@ class WebApprovalSystem:
         Returns:
             The option string that best matches the default
         """
-        # Try to find option matching default
-        for option in options:
-            option_lower = option.lower()
-            if default == "allow" and (
-                "allow" in option_lower or "yes" in option_lower
-            ):
-                return option
-            if default == "deny" and ("deny" in option_lower or "no" in option_lower):
-                return option
-
-        # Fall back to last option (typically "deny") or first
-        return options[-1] if default == "deny" else options[0]
+        return _match_default(default, tuple(options))
+
+
+@lru_cache(maxsize=256)
+def _match_default(default: str, options: tuple[str, ...]) -> str:
+    """Match default against options; cached since tools reuse option lists."""
+    # Try to find option matching default
+    for option in options:
+        option_lower = option.lower()
+        if default == "allow" and ("allow" in option_lower or "yes" in option_lower):
+            return option
+        if default == "deny" and ("deny" in option_lower or "no" in option_lower):
+            return option
+
+    # Fall back to last option (typically "deny") or first
+    return options[-1] if default == "deny" else options[0]
@@ -10,6 +10,8 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING, Literal
 
+from .. import json_utils
+
 if TYPE_CHECKING:
     from fastapi import WebSocket
 
@@ -50,17 +52,18 @@ class WebDisplaySystem:
             source: Message source (for context, e.g., hook name)
         """
         try:
-            await self._websocket.send_json(
+            await json_utils.send_json(
+                self._websocket,
                 {
                     "type": "display_message",
                     "level": level,
                     "message": message,
                     "source": source,
                     "nesting": self._nesting_depth,
-                }
+                },
             )
         except Exception as e:
-            logger.warning(f"Failed to send display message: {e}")
+            logger.warning("Failed to send display message: %s", e)
 
     def push_nesting(self) -> "WebDisplaySystem":
         """
@@ -10,18 +10,84 @@ The frontend receives exactly what Amplifier emits for full debugging capability
 
 from __future__ import annotations
 
+import asyncio
 import difflib
 import logging
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from amplifier_core.models import HookResult
 
+from .. import json_utils
+
 if TYPE_CHECKING:
     from fastapi import WebSocket
 
+    from ..database import Database
+
 logger = logging.getLogger(__name__)
 
+# Key order of content_delta messages, filled in per delta
+_CONTENT_DELTA_TEMPLATE: dict[str, Any] = {
+    "type": "content_delta",
+    "index": 0,
+    "delta": "",
+    "block_type": "text",
+}
+
+# Token-streaming events, which never carry image payloads; everything else
+# (including raw llm:request/response events) may and is sanitized
+_TEXT_ONLY_EVENTS = frozenset({"content_block:delta", "thinking:delta"})
+
+# Events suppressed entirely when thinking display is off
+_THINKING_EVENTS = frozenset({"thinking:delta", "thinking:final"})
+
+# File tools whose target content is captured before and after the edit
+_CONTENT_TOOLS = frozenset({"write_file", "edit_file"})
+
+# Shell constructs that suggest a bash command wrote a file
+_BASH_WRITE_RE = re.compile(r"cat >|echo >|tee |sed -i|mv ")
+
+# Files larger than this are not captured for artifact diffs
+MAX_CAPTURE_BYTES = 1 << 20
+
+# Above this many characters (before + after), artifact diffs are computed
+# by the system `diff` (C, Myers O(ND)) rather than pure-Python difflib
+NATIVE_DIFF_MIN_CHARS = 64 * 1024
+_DIFF_BIN = shutil.which("diff")
+
+# Files with more characters than this get a placeholder instead of a diff
+MAX_DIFF_CHARS = 2_000_000
+DIFF_OMITTED_TOO_LARGE = "[diff omitted: file too large]"
+
+# Artifact writes: queue bound (tool:post waits when full), batch size, and
+# how long the worker waits for more artifacts before writing a batch
+ARTIFACT_QUEUE_SIZE = 256
+ARTIFACT_BATCH_SIZE = 32
+ARTIFACT_BATCH_DELAY = 0.05
+
+# Longest a closing hook waits for queued artifacts to be written
+ARTIFACT_CLOSE_TIMEOUT = 10.0
+
+# How long consecutive content deltas for one block are merged before sending
+DELTA_COALESCE_SECONDS = 0.01
+
+# While more than this many characters wait in the outbound queue (a slow
+# client), the pending delta keeps absorbing new deltas instead of being sent
+BACKPRESSURE_CHARS = 64 * 1024
+
+# Limits on holding a merged delta back: it is sent anyway once it has been
+# held this long, or inline (waiting on the sender) once it grows this large
+MAX_DELTA_HOLD_SECONDS = 0.5
+MAX_PENDING_DELTA_CHARS = 64 * 1024
+
 
 class WebStreamingHook:
     """
@@ -39,7 +105,7 @@ class WebStreamingHook:
     priority = 100  # Run early to capture events
 
     # Tools that create file artifacts
-    FILE_TOOLS = {"write_file", "edit_file", "bash"}
+    FILE_TOOLS = frozenset({"write_file", "edit_file", "bash"})
 
     def __init__(
         self,
@@ -58,9 +124,44 @@ class WebStreamingHook:
         self._websocket = websocket
         self._show_thinking = show_thinking
         self._session_id = session_id
+        # Events dropped outright for the current show_thinking setting
+        self._hidden_events = frozenset() if show_thinking else _THINKING_EVENTS
         self._current_blocks: dict[int, str] = {}  # index -> block_type
         self._pending_file_ops: dict[str, dict] = {}  # tool_call_id -> tool info
 
+        # content_delta being merged with the deltas that follow it for the
+        # same block, the block key, and the delta texts collected so far
+        self._pending_delta: dict[str, Any] | None = None
+        self._pending_delta_key: tuple[Any, ...] | None = None
+        self._pending_delta_parts: list[str] = []
+        self._pending_delta_chars = 0
+        self._delta_flush_task: asyncio.Task[None] | None = None
+        self.deltas_coalesced = 0  # Deltas merged into an earlier one
+
+        # Finished file operations waiting to be written as artifacts
+        self._artifact_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(
+            maxsize=ARTIFACT_QUEUE_SIZE
+        )
+        self._artifact_task: asyncio.Task[None] | None = None
+        self._db: Database | None = None  # Bound on first artifact write
+
+        # Event name -> message builder; other events pass through as-is
+        self._handlers: dict[
+            str,
+            Callable[[dict[str, Any], dict[str, Any]], dict[str, Any] | None],
+        ] = {
+            "content_block:start": self._on_content_start,
+            "content_block:delta": self._on_content_delta,
+            "content_block:end": self._on_content_end,
+            "thinking:delta": self._on_thinking_delta,
+            "thinking:final": self._on_thinking_final,
+            "tool:pre": self._on_tool_pre,
+            "tool:post": self._on_tool_post,
+            "tool:error": self._on_tool_error,
+            "session:fork": self._on_session_fork,
+            "user:notification": self._on_user_notification,
+        }
+
     async def __call__(self, event: str, data: dict[str, Any]) -> HookResult:
         """
         Handle Amplifier event and stream to browser.
@@ -72,15 +173,29 @@ class WebStreamingHook:
         Returns:
             HookResult with action="continue"
         """
-        # Log all events for debugging (helps identify what's being emitted)
-        # Using INFO level temporarily to diagnose missing events
-        logger.info(f"[EVENT] {event}: {list(data.keys()) if data else 'no data'}")
+        # Log all events for debugging (helps identify what's being emitted);
+        # checked up front so the per-token path pays nothing when disabled
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("[EVENT] %s: %s", event, list(data) if data else "no data")
 
         try:
             message = self._map_event_to_message(event, data)
+            if event == "tool:pre":
+                await self._capture_content_before(data.get("tool_call_id", ""))
+            elif event == "tool:post":
+                await self._queue_artifact(data.get("tool_call_id", ""))
             if message:
-                await self._websocket.send_json(message)
-                logger.info(f"[SENT] {message.get('type', event)}")
+                if message["type"] == "content_delta" and isinstance(
+                    message.get("delta"), str
+                ):
+                    await self._buffer_delta(message)
+                else:
+                    # Anything else must follow the deltas that preceded it
+                    await self.flush()
+                    await json_utils.send_json(self._websocket, message)
+                    if debug:
+                        logger.debug("[SENT] %s", message.get("type", event))
         except Exception as e:
             logger.warning(f"Failed to stream event {event}: {e}")
 
@@ -103,295 +218,505 @@ class WebStreamingHook:
         Returns:
             WebSocket message dict or None if event should be skipped
         """
-        # Sanitize to remove only image binary data
-        sanitized = self._sanitize_for_ws(data)
-
-        # Convert event name to WebSocket message type
-        # e.g., "content_block:start" -> "content_start", "llm:request:raw" -> "llm_request_raw"
-        ws_type = event.replace(":", "_").replace("_block", "")
-
-        # Content streaming events - need index tracking for UI
-        if event == "content_block:start":
-            block_type = data.get("block_type") or data.get("type", "text")
-            raw_index = (
-                data.get("block_index")
-                if data.get("block_index") is not None
-                else data.get("index")
-            )
-            index: int = int(raw_index) if raw_index is not None else 0
-            self._current_blocks[index] = block_type
+        if event in self._hidden_events:
+            return None
 
-            # Skip thinking blocks if disabled
-            if block_type == "thinking" and not self._show_thinking:
-                return None
+        # Sanitize to remove only image binary data (streaming deltas carry
+        # token text only, so the hottest events skip the walk)
+        if event in _TEXT_ONLY_EVENTS:
+            sanitized = data
+        else:
+            sanitized = self._sanitize_for_ws(data)
 
+        handler = self._handlers.get(event)
+        if handler is None:
+            # All other events - pass through with raw data
             return {
-                "type": "content_start",
-                "block_type": block_type,
-                "index": index,
-                **sanitized,  # Include full raw data
+                "type": _event_to_ws_type(event),
+                "event": event,  # Keep original event name for reference
+                **sanitized,
             }
+        return handler(data, sanitized)
 
-        elif event == "content_block:delta":
-            raw_index = (
-                data.get("block_index")
-                if data.get("block_index") is not None
-                else data.get("index")
-            )
-            index: int = int(raw_index) if raw_index is not None else 0
-            block_type = self._current_blocks.get(index, "text")
-
-            # Skip thinking blocks if disabled
-            if block_type == "thinking" and not self._show_thinking:
-                return None
+    # Content streaming events - need index tracking for UI
 
-            # Extract delta text for UI convenience
-            delta = data.get("delta", {})
-            delta_text = (
-                delta.get("text", "") if isinstance(delta, dict) else str(delta)
-            )
+    def _on_content_start(
+        self, data: dict[str, Any], sanitized: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Track the new block's type and announce it."""
+        block_type = data.get("block_type") or data.get("type", "text")
+        index = _resolve_index(data)
+        self._current_blocks[index] = block_type
+
+        # Skip thinking blocks if disabled
+        if block_type == "thinking" and not self._show_thinking:
+            return None
+
+        return {
+            "type": "content_start",
+            "block_type": block_type,
+            "index": index,
+            **sanitized,  # Include full raw data
+        }
+
+    def _on_content_delta(
+        self, data: dict[str, Any], sanitized: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Forward a content delta with its block index and type."""
+        index = _resolve_index(data)
+        block_type = self._current_blocks.get(index, "text")
+
+        # Skip thinking blocks if disabled
+        if block_type == "thinking" and not self._show_thinking:
+            return None
+
+        # Extract delta text for UI convenience
+        delta = data.get("delta", {})
+        delta_text = delta.get("text", "") if isinstance(delta, dict) else str(delta)
+
+        # Hottest message type: copying a prebuilt template (in C) is cheaper
+        # than building the dict literal
+        message = _CONTENT_DELTA_TEMPLATE.copy()
+        message["index"] = index
+        message["delta"] = delta_text
+        message["block_type"] = block_type
+        message.update(sanitized)  # Include full raw data
+        return message
+
+    def _on_content_end(
+        self, data: dict[str, Any], sanitized: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Close the block and forward its final content."""
+        index = _resolve_index(data)
+        block_type = self._current_blocks.pop(index, "text")
+
+        # Skip thinking blocks if disabled
+        if block_type == "thinking" and not self._show_thinking:
+            return None
+
+        # Extract content for UI convenience
+        block = data.get("block", {})
+        if isinstance(block, dict):
+            content = block.get("text", "") or block.get("content", "")
+        else:
+            content = data.get("content", "")
 
-            return {
-                "type": "content_delta",
-                "index": index,
-                "delta": delta_text,
-                "block_type": block_type,
-                **sanitized,  # Include full raw data
-            }
+        return {
+            "type": "content_end",
+            "index": index,
+            "content": content,
+            "block_type": block_type,
+            **sanitized,  # Include full raw data
+        }
 
-        elif event == "content_block:end":
-            raw_index = (
-                data.get("block_index")
-                if data.get("block_index") is not None
-                else data.get("index")
-            )
-            index: int = int(raw_index) if raw_index is not None else 0
-            block_type = self._current_blocks.pop(index, "text")
+    # Thinking events
 
-            # Skip thinking blocks if disabled
-            if block_type == "thinking" and not self._show_thinking:
-                return None
+    def _on_thinking_delta(
+        self, data: dict[str, Any], sanitized: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Forward a thinking delta (hidden ones never reach here)."""
+        return {
+            "type": "thinking_delta",
+            **sanitized,
+        }
+
+    def _on_thinking_final(
+        self, data: dict[str, Any], sanitized: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Forward the final thinking text (hidden ones never reach here)."""
+        return {
+            "type": "thinking_final",
+            **sanitized,
+        }
 
-            # Extract content for UI convenience
-            block = data.get("block", {})
-            if isinstance(block, dict):
-                content = block.get("text", "") or block.get("content", "")
-            else:
-                content = data.get("content", "")
+    # Tool lifecycle - add convenience fields for UI
 
-            return {
-                "type": "content_end",
-                "index": index,
-                "content": content,
-                "block_type": block_type,
-                **sanitized,  # Include full raw data
+    def _on_tool_pre(
+        self, data: dict[str, Any], sanitized: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Announce a tool call, capturing file content for artifacts."""
+        tool_name = data.get("tool_name", "unknown")
+        tool_call_id = data.get("tool_call_id", "")
+        arguments = data.get("tool_input") or data.get("arguments", {})
+
+        # Track file operations for artifact recording (file content before
+        # the operation is captured by __call__, off the event loop); without
+        # a session there is nowhere to record them
+        if self._session_id and tool_name in self.FILE_TOOLS:
+            self._pending_file_ops[tool_call_id] = {
+                "tool_name": tool_name,
+                "arguments": arguments,
+                "content_before": None,
+                "existed": False,
             }
 
-        # Thinking events
-        elif event == "thinking:delta":
-            if not self._show_thinking:
-                return None
-            return {
-                "type": "thinking_delta",
-                **sanitized,
-            }
+        return {
+            "type": "tool_call",
+            "tool_name": tool_name,
+            "tool_call_id": tool_call_id,
+            "arguments": arguments,
+            "status": "pending",
+            **sanitized,  # Include full raw data
+        }
+
+    def _on_tool_post(
+        self, data: dict[str, Any], sanitized: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Forward a tool result (artifacts are queued by __call__)."""
+        tool_name = data.get("tool_name", "unknown")
+        tool_call_id = data.get("tool_call_id", "")
+        result = data.get("result", {})
+
+        return {
+            "type": "tool_result",
+            "tool_name": tool_name,
+            "tool_call_id": tool_call_id,
+            "output": result.get("output", "")
+            if isinstance(result, dict)
+            else str(result),
+            "success": result.get("success", True)
+            if isinstance(result, dict)
+            else True,
+            "error": result.get("error") if isinstance(result, dict) else None,
+            **sanitized,  # Include full raw data
+        }
+
+    def _on_tool_error(
+        self, data: dict[str, Any], sanitized: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Forward a tool error, dropping any file op it left pending."""
+        self._pending_file_ops.pop(data.get("tool_call_id", ""), None)
+        return {
+            "type": "tool_error",
+            **sanitized,
+        }
 
-        elif event == "thinking:final":
-            if not self._show_thinking:
-                return None
-            return {
-                "type": "thinking_final",
-                **sanitized,
-            }
+    # Session lifecycle
 
-        # Tool lifecycle - add convenience fields for UI
-        elif event == "tool:pre":
-            tool_name = data.get("tool_name", "unknown")
-            tool_call_id = data.get("tool_call_id", "")
-            arguments = data.get("tool_input") or data.get("arguments", {})
-
-            # Track file operations for artifact recording
-            if tool_name in self.FILE_TOOLS:
-                file_path = arguments.get("file_path")
-                content_before = None
-
-                # Capture file content before the operation
-                if file_path and tool_name in {"write_file", "edit_file"}:
-                    try:
-                        path = Path(file_path).expanduser()
-                        if path.exists():
-                            content_before = path.read_text(encoding="utf-8")
-                    except Exception as e:
-                        logger.debug(f"Could not read file before edit: {e}")
-
-                self._pending_file_ops[tool_call_id] = {
-                    "tool_name": tool_name,
-                    "arguments": arguments,
-                    "content_before": content_before,
-                }
+    def _on_session_fork(
+        self, data: dict[str, Any], sanitized: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Forward a sub-session fork."""
+        return {
+            "type": "session_fork",
+            **sanitized,
+        }
 
-            return {
-                "type": "tool_call",
-                "tool_name": tool_name,
-                "tool_call_id": tool_call_id,
-                "arguments": arguments,
-                "status": "pending",
-                **sanitized,  # Include full raw data
-            }
+    # User notifications - map to display_message for UI
 
-        elif event == "tool:post":
-            tool_name = data.get("tool_name", "unknown")
-            tool_call_id = data.get("tool_call_id", "")
-            result = data.get("result", {})
+    def _on_user_notification(
+        self, data: dict[str, Any], sanitized: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Forward a user notification as a display message."""
+        return {
+            "type": "display_message",
+            **sanitized,
+        }
 
-            # Record file artifact if this was a file operation
-            if tool_call_id in self._pending_file_ops:
-                self._record_artifact(tool_call_id, tool_name, result)
-                del self._pending_file_ops[tool_call_id]
+    async def _capture_content_before(self, tool_call_id: str) -> None:
+        """
+        Read a write_file/edit_file target before the tool runs.
 
-            return {
-                "type": "tool_result",
-                "tool_name": tool_name,
-                "tool_call_id": tool_call_id,
-                "output": result.get("output", "")
-                if isinstance(result, dict)
-                else str(result),
-                "success": result.get("success", True)
-                if isinstance(result, dict)
-                else True,
-                "error": result.get("error") if isinstance(result, dict) else None,
-                **sanitized,  # Include full raw data
-            }
+        The read happens in a worker thread so streaming continues meanwhile,
+        but is awaited here: the tool only runs once the hook returns, so the
+        captured content is guaranteed to predate the edit.
+        """
+        pending = self._pending_file_ops.get(tool_call_id)
+        if not pending or pending["tool_name"] not in _CONTENT_TOOLS:
+            return
+        file_path = pending["arguments"].get("file_path")
+        if not file_path:
+            return
+        pending["existed"], pending["content_before"] = await asyncio.to_thread(
+            _read_file_text, file_path
+        )
 
-        elif event == "tool:error":
-            return {
-                "type": "tool_error",
-                **sanitized,
-            }
+    async def flush(self) -> None:
+        """Send the pending merged content delta, if any."""
+        message = self._pending_delta
+        if message is None:
+            return
 
-        # Session lifecycle
-        elif event == "session:fork":
-            return {
-                "type": "session_fork",
-                **sanitized,
-            }
+        task = self._delta_flush_task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        self._delta_flush_task = None
 
-        # User notifications - map to display_message for UI
-        elif event == "user:notification":
-            return {
-                "type": "display_message",
-                **sanitized,
-            }
+        message["delta"] = "".join(self._pending_delta_parts)
+        self._pending_delta = None
+        self._pending_delta_key = None
+        self._pending_delta_parts = []
+        self._pending_delta_chars = 0
+        await json_utils.send_json(self._websocket, message)
 
-        # All other events - pass through with raw data
+    async def _buffer_delta(self, message: dict[str, Any]) -> None:
+        """
+        Merge a content_delta into the pending one for the same block.
+
+        Deltas for the same block (index and originating sub-session) are
+        sent as a single content_delta with the concatenated text, at most
+        DELTA_COALESCE_SECONDS after the first one; the merged message keeps
+        the other raw fields of the first delta. A merged delta that reaches
+        MAX_PENDING_DELTA_CHARS is sent right away, so its memory is bounded
+        and a stalled client holds the producer back at the sender.
+        """
+        key = (
+            message["index"],
+            message.get("child_session_id"),
+            message.get("parent_tool_call_id"),
+        )
+        if self._pending_delta is not None and key != self._pending_delta_key:
+            await self.flush()
+
+        if self._pending_delta is None:
+            self._pending_delta = message
+            self._pending_delta_key = key
+            self._pending_delta_parts = [message["delta"]]
+            self._pending_delta_chars = len(message["delta"])
+            self._delta_flush_task = asyncio.create_task(self._flush_later())
         else:
-            return {
-                "type": ws_type,
-                "event": event,  # Keep original event name for reference
-                **sanitized,
-            }
+            self._pending_delta_parts.append(message["delta"])
+            self._pending_delta_chars += len(message["delta"])
+            self.deltas_coalesced += 1
+            if self._pending_delta_chars >= MAX_PENDING_DELTA_CHARS:
+                await self.flush()
+
+    async def _flush_later(self) -> None:
+        """
+        Flush the pending delta once the coalescing window ends.
+
+        The window is extended while the client is backlogged, up to
+        MAX_DELTA_HOLD_SECONDS, so a slow reader gets few large deltas rather
+        than a queue of small ones. Any other message still flushes it
+        immediately.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + MAX_DELTA_HOLD_SECONDS
+        await asyncio.sleep(DELTA_COALESCE_SECONDS)
+        while (
+            getattr(self._websocket, "backlog", 0) > BACKPRESSURE_CHARS
+            and loop.time() < deadline
+        ):
+            await asyncio.sleep(DELTA_COALESCE_SECONDS)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Failed to stream content delta: {e}")
 
     def set_show_thinking(self, show: bool) -> None:
         """Toggle thinking block display."""
         self._show_thinking = show
+        self._hidden_events = frozenset() if show else _THINKING_EVENTS
 
     def set_session_id(self, session_id: str) -> None:
         """Set session ID for artifact tracking."""
         self._session_id = session_id
 
-    def _record_artifact(
-        self, tool_call_id: str, tool_name: str, result: dict[str, Any]
-    ) -> None:
-        """Record a file artifact from a tool operation."""
-        if not self._session_id:
+    async def _queue_artifact(self, tool_call_id: str) -> None:
+        """
+        Hand a finished file operation to the artifact worker.
+
+        Only the edit_file read-back happens here (off-thread, but before the
+        hook returns, so no later edit can race it); diffing and the database
+        write are left to the worker.
+        """
+        pending = self._pending_file_ops.pop(tool_call_id, None)
+        if pending is None:
             return
 
+        pending["session_id"] = self._session_id
+        pending["created_at"] = time.time_ns()
+        if pending["tool_name"] == "edit_file":
+            file_path = pending["arguments"].get("file_path")
+            if file_path:
+                _, pending["content_after"] = await asyncio.to_thread(
+                    _read_file_text, file_path
+                )
+
+        if self._artifact_task is None:
+            self._artifact_task = asyncio.create_task(self._artifact_worker())
+        await self._artifact_queue.put(pending)
+
+    async def _artifact_worker(self) -> None:
+        """Write queued artifacts in batches, one transaction per batch."""
+        queue = self._artifact_queue
+        while True:
+            batch = [await queue.get()]
+            # Items taken are marked done even if the worker is cancelled
+            # mid-batch, so close() never waits on them
+            try:
+                # Let the rest of a burst of file edits arrive
+                await asyncio.sleep(ARTIFACT_BATCH_DELAY)
+                while len(batch) < ARTIFACT_BATCH_SIZE and not queue.empty():
+                    batch.append(queue.get_nowait())
+                await asyncio.to_thread(self._write_artifacts, batch)
+            except Exception as e:
+                logger.warning(f"Failed to record artifacts: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def close(self) -> None:
+        """
+        Flush the pending delta and stop the hook's background tasks.
+
+        Queued artifacts are given up to ARTIFACT_CLOSE_TIMEOUT to be written;
+        if the worker has already stopped, nothing is waited for.
+        """
         try:
-            from ..database import get_database
+            await self.flush()
+        except Exception as e:
+            logger.debug(f"Could not flush pending delta on close: {e}")
+        if self._delta_flush_task is not None:
+            self._delta_flush_task.cancel()
+            self._delta_flush_task = None
 
-            db = get_database()
-            pending = self._pending_file_ops.get(tool_call_id, {})
-            args = pending.get("arguments", {})
-            content_before = pending.get("content_before")
+        task = self._artifact_task
+        if task is None:
+            return
+        self._artifact_task = None
+        if not task.done():
+            try:
+                await asyncio.wait_for(
+                    self._artifact_queue.join(), ARTIFACT_CLOSE_TIMEOUT
+                )
+            except TimeoutError:
+                logger.warning(
+                    "Gave up on %d queued artifacts after %ss",
+                    self._artifact_queue.qsize(),
+                    ARTIFACT_CLOSE_TIMEOUT,
+                )
+        task.cancel()
+
+    def _write_artifacts(self, pending_ops: list[dict[str, Any]]) -> None:
+        """Build and store artifacts for finished file operations (thread)."""
+        by_session: dict[str, list[dict[str, Any]]] = {}
+        for pending in pending_ops:
+            try:
+                artifact = self._build_artifact(pending)
+            except Exception as e:
+                logger.warning(f"Failed to build artifact: {e}")
+                continue
+            if artifact is not None:
+                by_session.setdefault(pending["session_id"], []).append(artifact)
+
+        db = self._get_db()
+        for session_id, artifacts in by_session.items():
+            db.add_artifacts_bulk(session_id, artifacts)
+            if logger.isEnabledFor(logging.INFO):
+                for artifact in artifacts:
+                    logger.info(
+                        "Recorded artifact: %s %s",
+                        artifact["operation"],
+                        artifact["file_path"],
+                    )
 
-            # Extract file path and operation details
-            file_path = None
-            operation = "edit"
-            content_after = None
-            diff = None
+    def _get_db(self) -> Database:
+        """The artifact database, looked up (and imported) on first use."""
+        if self._db is None:
+            from ..database import get_database
 
-            if tool_name == "write_file":
-                file_path = args.get("file_path")
-                operation = "create" if content_before is None else "edit"
-                content_after = args.get("content")
+            self._db = get_database()
+        return self._db
 
-                # Generate unified diff
+    def _build_artifact(self, pending: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        Turn a finished file operation into an artifact record.
+
+        Returns:
+            Dict for Database.add_artifacts_bulk, or None if no file path
+            could be determined.
+        """
+        tool_name = pending["tool_name"]
+        args = pending.get("arguments", {})
+        content_before = pending.get("content_before")
+        existed = pending.get("existed", content_before is not None)
+
+        # Extract file path and operation details
+        file_path = None
+        operation = "edit"
+        content_after = None
+        diff = None
+
+        if tool_name == "write_file":
+            file_path = args.get("file_path")
+            operation = "edit" if existed else "create"
+            content_after = args.get("content")
+
+            # Generate unified diff. An existing file whose old content wasn't
+            # captured (over MAX_CAPTURE_BYTES or unreadable) gets no diff,
+            # rather than one showing the whole file as added.
+            if content_before is not None or not existed:
                 diff = self._generate_unified_diff(
                     content_before or "",
                     content_after or "",
                     file_path or "file",
                 )
 
-            elif tool_name == "edit_file":
-                file_path = args.get("file_path")
-                operation = "edit"
-                old_string = args.get("old_string", "")
-                new_string = args.get("new_string", "")
-
-                # Read the file after the edit to get full content
-                if file_path:
-                    try:
-                        path = Path(file_path).expanduser()
-                        if path.exists():
-                            content_after = path.read_text(encoding="utf-8")
-                    except Exception as e:
-                        logger.debug(f"Could not read file after edit: {e}")
-
-                # Generate unified diff from before/after content
-                if content_before is not None and content_after is not None:
-                    diff = self._generate_unified_diff(
-                        content_before,
-                        content_after,
-                        file_path or "file",
-                    )
-                else:
-                    # Fallback: simple diff from old/new strings
-                    diff = self._generate_unified_diff(
-                        old_string,
-                        new_string,
-                        file_path or "file",
-                    )
+        elif tool_name == "edit_file":
+            file_path = args.get("file_path")
+            operation = "edit"
+            old_string = args.get("old_string", "")
+            new_string = args.get("new_string", "")
 
-            elif tool_name == "bash":
-                # Check if bash command modified files
-                cmd = args.get("command", "")
-                if any(
-                    op in cmd for op in ["cat >", "echo >", "tee ", "sed -i", "mv "]
-                ):
-                    operation = "bash"
-                    # Try to extract file path from command
-                    for part in cmd.split():
-                        if "/" in part and not part.startswith("-"):
-                            file_path = part
-                            break
+            # Full content after the edit, read back by _queue_artifact
+            content_after = pending.get("content_after")
 
-            if file_path:
-                db.add_artifact(
-                    session_id=self._session_id,
-                    file_path=file_path,
-                    operation=operation,
-                    content_before=content_before,
-                    content_after=content_after,
-                    diff=diff,
+            # Generate unified diff from before/after content
+            if content_before is not None and content_after is not None:
+                diff = self._generate_unified_diff(
+                    content_before,
+                    content_after,
+                    file_path or "file",
+                )
+            else:
+                # Fallback: simple diff from old/new strings
+                diff = self._generate_unified_diff(
+                    old_string,
+                    new_string,
+                    file_path or "file",
                 )
-                logger.info(f"Recorded artifact: {operation} {file_path}")
-        except Exception as e:
-            logger.warning(f"Failed to record artifact: {e}")
+
+        elif tool_name == "bash":
+            # Check if bash command modified files
+            cmd = args.get("command", "")
+            if _BASH_WRITE_RE.search(cmd):
+                operation = "bash"
+                # Try to extract file path from command
+                for part in cmd.split():
+                    if "/" in part and not part.startswith("-"):
+                        file_path = part
+                        break
+
+        if not file_path:
+            return None
+        return {
+            "file_path": file_path,
+            "operation": operation,
+            "content_before": content_before,
+            "content_after": content_after,
+            "diff": diff,
+            "created_at": pending["created_at"],
+        }
 
     def _generate_unified_diff(
         self, content_before: str, content_after: str, file_path: str
     ) -> str:
         """Generate a unified diff between two file contents."""
+        # Idempotent writes are common; no need to split and diff them
+        if content_before == content_after:
+            return ""
+        if max(len(content_before), len(content_after)) > MAX_DIFF_CHARS:
+            return DIFF_OMITTED_TOO_LARGE
+
+        if (
+            _DIFF_BIN
+            and len(content_before) + len(content_after) >= NATIVE_DIFF_MIN_CHARS
+        ):
+            diff = _native_unified_diff(content_before, content_after, file_path)
+            if diff is not None:
+                return diff
+
         before_lines = content_before.splitlines(keepends=True)
         after_lines = content_after.splitlines(keepends=True)
 
@@ -406,7 +731,6 @@ class WebStreamingHook:
             after_lines,
             fromfile=f"a/{file_path}",
             tofile=f"b/{file_path}",
-            lineterm="",
         )
 
         return "".join(diff_lines)
@@ -417,29 +741,144 @@ class WebStreamingHook:
 
         Only removes large binary data (images) to avoid huge payloads.
         All other data is passed through unchanged for full debugging.
+        Returns data itself when it contains no images (the common case);
+        otherwise only the containers on the path to an image are copied.
         """
+        if not _needs_sanitize(data):
+            return data
+        return _sanitize_value(data)
 
-        def sanitize_value(val: Any) -> Any:
-            if isinstance(val, dict):
-                # Check for image source pattern
-                if val.get("type") == "image" and "source" in val:
-                    sanitized = dict(val)
-                    sanitized["source"] = {
-                        "type": "base64",
-                        "data": "[image data omitted]",
-                    }
-                    return sanitized
-                # Check for base64 image source
-                if (
-                    val.get("type") == "base64"
-                    and "data" in val
-                    and len(str(val.get("data", ""))) > 1000
-                ):
-                    return {"type": "base64", "data": "[image data omitted]"}
-                return {k: sanitize_value(v) for k, v in val.items()}
-            elif isinstance(val, list):
-                return [sanitize_value(item) for item in val]
-            else:
-                return val
 
-        return sanitize_value(data)
+def _native_unified_diff(
+    content_before: str, content_after: str, file_path: str
+) -> str | None:
+    """
+    Unified diff via the system `diff -u`.
+
+    Returns:
+        The diff text, or None if diff failed (caller falls back to difflib)
+    """
+    try:
+        with tempfile.TemporaryDirectory(prefix="amplifier-diff-") as tmp:
+            before_path = Path(tmp, "before")
+            after_path = Path(tmp, "after")
+            before_path.write_text(content_before, encoding="utf-8")
+            after_path.write_text(content_after, encoding="utf-8")
+            result = subprocess.run(
+                [
+                    _DIFF_BIN,
+                    "-u",
+                    "--label",
+                    f"a/{file_path}",
+                    "--label",
+                    f"b/{file_path}",
+                    str(before_path),
+                    str(after_path),
+                ],
+                capture_output=True,
+                timeout=30,
+            )
+    except Exception as e:
+        logger.debug(f"Native diff failed for {file_path}: {e}")
+        return None
+
+    # Exit status 0: identical, 1: differences, anything else: trouble
+    if result.returncode not in (0, 1):
+        return None
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def _read_file_text(file_path: str) -> tuple[bool, str | None]:
+    """
+    Read a file's text around an edit (runs in a worker thread).
+
+    Returns:
+        (whether the file exists, its content or None if missing, too large
+        (over MAX_CAPTURE_BYTES) or unreadable)
+    """
+    exists = False
+    try:
+        path = Path(file_path).expanduser()
+        exists = path.exists()
+        if not exists or path.stat().st_size > MAX_CAPTURE_BYTES:
+            return exists, None
+        return True, path.read_text(encoding="utf-8")
+    except Exception as e:
+        logger.debug(f"Could not read file for artifact: {e}")
+        return exists, None
+
+
+def _resolve_index(data: dict[str, Any]) -> int:
+    """Block index of a content event (block_index, else index, else 0)."""
+    raw_index = data.get("block_index")
+    if raw_index is None:
+        raw_index = data.get("index")
+    return int(raw_index) if raw_index is not None else 0
+
+
+@lru_cache(maxsize=128)
+def _event_to_ws_type(event: str) -> str:
+    """
+    Convert an event name to its WebSocket message type.
+
+    e.g., "content_block:start" -> "content_start",
+    "llm:request:raw" -> "llm_request_raw"
+    """
+    return event.replace(":", "_").replace("_block", "")
+
+
+# Replacement image source; shared by every sanitized message, never mutated
+_IMAGE_DATA_OMITTED = {"type": "base64", "data": "[image data omitted]"}
+
+
+def _is_image_node(val: dict[str, Any]) -> bool:
+    """Whether val is an image block or a large base64 source."""
+    node_type = val.get("type")
+    if node_type == "image":
+        return "source" in val
+    if node_type != "base64":
+        return False
+    # Measure the payload directly; str() would copy it just to get a length
+    data = val.get("data")
+    return isinstance(data, (str, bytes, bytearray)) and len(data) > 1000
+
+
+def _needs_sanitize(data: Any) -> bool:
+    """Iteratively check whether data contains any image node."""
+    stack = [data]
+    while stack:
+        val = stack.pop()
+        if isinstance(val, dict):
+            if _is_image_node(val):
+                return True
+            stack.extend(val.values())
+        elif isinstance(val, list):
+            stack.extend(val)
+    return False
+
+
+def _sanitize_value(val: Any) -> Any:
+    """Replace image data, copying only containers that change."""
+    if isinstance(val, dict):
+        if _is_image_node(val):
+            if val.get("type") == "image":
+                return val | {"source": _IMAGE_DATA_OMITTED}
+            return _IMAGE_DATA_OMITTED
+        copy = None
+        for k, v in val.items():
+            new = _sanitize_value(v)
+            if new is not v:
+                if copy is None:
+                    copy = dict(val)
+                copy[k] = new
+        return val if copy is None else copy
+    elif isinstance(val, list):
+        copy = None
+        for i, item in enumerate(val):
+            new = _sanitize_value(item)
+            if new is not item:
+                if copy is None:
+                    copy = list(val)
+                copy[i] = new
+        return val if copy is None else copy
+    return val
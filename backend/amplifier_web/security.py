@@ -7,6 +7,7 @@ Provides path validation to prevent directory traversal attacks.
 from __future__ import annotations
 
 import logging
+import os
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -25,6 +26,23 @@ ALLOWED_PATH_ROOTS = [
 ]
 
 
+# Extra roots allowed for session CWDs outside home (development/testing),
+# resolved once at import
+_SAFE_CWD_ROOTS = tuple(str(Path(p).resolve()) for p in ("/tmp", "/var/tmp"))
+
+
+def _is_within(path_str: str, root_str: str) -> bool:
+    """
+    Check whether a resolved path string is root_str or lies beneath it.
+
+    Plain string comparison on already-resolved paths; the separator suffix
+    keeps siblings like /tmpfoo from matching /tmp.
+    """
+    return path_str == root_str or path_str.startswith(
+        root_str.rstrip(os.sep) + os.sep
+    )
+
+
 def validate_path(
     path: str | Path, allowed_root: Path
 ) -> tuple[bool, str, Path | None]:
@@ -70,26 +88,15 @@ def validate_path(
         # For session paths, we'll handle this by changing CWD or making absolute first
         resolved = path_obj.resolve()
 
-        # Check if resolved path is within allowed root
-        try:
-            # relative_to() raises ValueError if not a subpath
-            resolved.relative_to(allowed_root)
-        except ValueError:
+        # Check if resolved path is within allowed root. Both sides are fully
+        # resolved, so this also catches escapes via symlinks.
+        if not _is_within(str(resolved), str(allowed_root)):
             return (
                 False,
                 f"Path is outside allowed directory. Path: {resolved}, Allowed: {allowed_root}",
                 None,
             )
 
-        # Additional check: ensure the resolved path didn't escape via symlinks
-        # We already resolved, so we just need to confirm it's still under the root
-        if not str(resolved).startswith(str(allowed_root)):
-            return (
-                False,
-                f"Path escapes allowed directory via symlink: {resolved}",
-                None,
-            )
-
         logger.debug(f"Path validation passed: {path} -> {resolved}")
         return (True, "", resolved)
 
@@ -149,21 +156,11 @@ def validate_session_cwd(cwd: str | Path | None) -> tuple[bool, str, Path | None
             return (False, f"CWD is not a directory: {resolved_cwd}", None)
 
         # Validate it's within user's home directory
-        home = Path.home().resolve()
-        try:
-            resolved_cwd.relative_to(home)
-        except ValueError:
+        resolved_str = str(resolved_cwd)
+        if not _is_within(resolved_str, str(Path.home().resolve())):
             # Allow paths outside home if they're in common safe locations
             # This is for development/testing scenarios
-            safe_roots = [
-                Path("/tmp"),
-                Path("/var/tmp"),
-            ]
-
-            is_safe = any(
-                str(resolved_cwd).startswith(str(safe_root.resolve()))
-                for safe_root in safe_roots
-            )
+            is_safe = any(_is_within(resolved_str, root) for root in _SAFE_CWD_ROOTS)
 
             if not is_safe:
                 logger.warning(
@@ -17,6 +17,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+from . import json_utils
 from .bundle_manager import BundleManager
 from .protocols import (
     WebApprovalSystem,
@@ -68,6 +69,10 @@ class ActiveSession:
     streaming_hook: WebStreamingHook
     amplifier_session: Any = None  # Created on first execute
     execute_task: asyncio.Task | None = None  # For cancellation support
+    # Serialized /status reply around the turn count, and the /tools reply
+    # with the mount plan tools list it was built from
+    status_result_parts: tuple[str, str] | None = None
+    tools_result_json: tuple[list[Any], str] | None = None
     _lock: asyncio.Lock = field(default_factory=asyncio.Lock)
 
 
@@ -194,14 +199,15 @@ class SessionManager:
         self._active[session_id] = active
 
         # Notify browser
-        await websocket.send_json(
+        await json_utils.send_json(
+            websocket,
             {
                 "type": "session_created",
                 "session_id": session_id,
                 "bundle": bundle_name,
                 "behaviors": behaviors or [],
                 "cwd": str(session_cwd) if session_cwd else None,
-            }
+            },
         )
 
         # Send debug info about the bundle configuration
@@ -540,28 +546,35 @@ class SessionManager:
                 # Save transcript after each turn
                 await self._save_transcript(active)
 
-                # Notify completion
+                # Notify completion (after any merged delta still pending)
+                await active.streaming_hook.flush()
                 logger.info(f"Sending prompt_complete for session {session_id}")
-                await active.websocket.send_json(
+                await json_utils.send_json(
+                    active.websocket,
                     {
                         "type": "prompt_complete",
                         "turn": active.metadata.turn_count,
-                    }
+                    },
                 )
                 logger.info(f"prompt_complete sent for session {session_id}")
 
             except asyncio.CancelledError:
                 logger.info(f"Session {session_id} execution cancelled")
-                await active.websocket.send_json({"type": "execution_cancelled"})
+                await active.streaming_hook.flush()
+                await json_utils.send_json(
+                    active.websocket, {"type": "execution_cancelled"}
+                )
                 raise
 
             except Exception as e:
                 logger.error(f"Execution error in session {session_id}: {e}")
-                await active.websocket.send_json(
+                await active.streaming_hook.flush()
+                await json_utils.send_json(
+                    active.websocket,
                     {
                         "type": "execution_error",
                         "error": str(e),
-                    }
+                    },
                 )
                 raise
 
@@ -590,11 +603,12 @@ class SessionManager:
             if immediate and active.execute_task and not active.execute_task.done():
                 active.execute_task.cancel()
 
-        await active.websocket.send_json(
+        await json_utils.send_json(
+            active.websocket,
             {
                 "type": "cancel_acknowledged",
                 "immediate": immediate,
-            }
+            },
         )
 
     async def handle_approval_response(
@@ -642,6 +656,9 @@ class SessionManager:
             except Exception as e:
                 logger.warning(f"Error cleaning up session {session_id}: {e}")
 
+        # Let queued file artifacts reach the database
+        await active.streaming_hook.close()
+
         # Save session metadata
         await self._save_session(active)
         logger.info(f"Closed session {session_id}")
@@ -715,7 +732,7 @@ class SessionManager:
                 except Exception as e:
                     debug_info["mount_plan"] = {"error": str(e)}
 
-            await websocket.send_json(debug_info)
+            await json_utils.send_json(websocket, debug_info)
             logger.info(
                 f"Sent bundle debug info: {len(bundle.tools)} tools, {len(bundle.providers)} providers"
             )
@@ -0,0 +1,77 @@
+"""
+Static file serving for the built frontend.
+
+Serves precompressed .br / .gz siblings of text assets (written by the
+frontend build) when the client accepts them, so uvicorn never compresses
+on the fly and large bundles go out at their compressed size.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import stat
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+# (Content-Encoding, file suffix) in order of preference
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Asset types the frontend build precompresses
+_COMPRESSIBLE_SUFFIXES = (".js", ".css", ".html", ".svg", ".json")
+
+
+def _accepted_encodings(scope: Scope) -> set[str]:
+    """Parse the request's Accept-Encoding into a set of coding names."""
+    value = Headers(scope=scope).get("accept-encoding", "")
+    accepted = set()
+    for token in value.split(","):
+        coding, _, params = token.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue  # Explicitly refused
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that prefers precompressed variants of text assets."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """
+        Return the precompressed variant of path if one exists and is accepted.
+
+        Falls back to StaticFiles for everything else (other methods, missing
+        variants, directories, 404s).
+        """
+        if scope["method"] in ("GET", "HEAD") and path.endswith(
+            _COMPRESSIBLE_SUFFIXES
+        ):
+            accepted = _accepted_encodings(scope)
+            for encoding, suffix in _ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                try:
+                    full_path, stat_result = await anyio.to_thread.run_sync(
+                        self.lookup_path, path + suffix
+                    )
+                except (OSError, ValueError):
+                    break  # Let StaticFiles produce the error response
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    response = self.file_response(full_path, stat_result, scope)
+                    media_type = mimetypes.guess_type(path)[0] or "text/plain"
+                    if media_type.startswith("text/"):
+                        media_type += "; charset=utf-8"
+                    response.headers["content-type"] = media_type
+                    response.headers["content-encoding"] = encoding
+                    response.headers["vary"] = "Accept-Encoding"
+                    return response
+
+        return await super().get_response(path, scope)
@@ -0,0 +1,153 @@
+"""
+Tests for outbound WebSocket frame batching (amplifier_web.batching).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from amplifier_web import batching, json_utils
+from amplifier_web.batching import MAX_BATCH_ITEMS, BatchingSender
+
+
+class FakeWebSocket:
+    """Records text frames instead of sending them."""
+
+    def __init__(self, fail: bool = False):
+        self.frames: list[str] = []
+        self._fail = fail
+
+    async def send_text(self, text: str) -> None:
+        if self._fail:
+            raise ConnectionError("socket closed")
+        self.frames.append(text)
+
+
+class SlowWebSocket(FakeWebSocket):
+    """Holds every send until released, like a client that stopped reading."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def send_text(self, text: str) -> None:
+        await self.release.wait()
+        await super().send_text(text)
+
+
+@pytest.mark.unit
+class TestBatchingSender:
+    """Tests for BatchingSender coalescing and ordering."""
+
+    def test_burst_is_sent_as_one_batch_frame(self) -> None:
+        """Messages queued in the same tick share one ordered batch frame."""
+
+        async def run() -> FakeWebSocket:
+            ws = FakeWebSocket()
+            sender = BatchingSender(ws)
+            for i in range(3):
+                await json_utils.send_json(sender, {"type": "delta", "i": i})
+            await sender.close()
+            return ws
+
+        ws = asyncio.run(run())
+        assert len(ws.frames) == 1
+        frame = json.loads(ws.frames[0])
+        assert frame["type"] == "batch"
+        assert [item["i"] for item in frame["items"]] == [0, 1, 2]
+
+    def test_single_message_is_sent_unwrapped(self) -> None:
+        """A lone message goes out as-is, without the batch envelope."""
+
+        async def run() -> FakeWebSocket:
+            ws = FakeWebSocket()
+            sender = BatchingSender(ws)
+            await json_utils.send_json(sender, {"type": "pong"})
+            await asyncio.sleep(0.01)
+            await json_utils.send_json(sender, {"type": "pong"})
+            await sender.close()
+            return ws
+
+        ws = asyncio.run(run())
+        assert [json.loads(f) for f in ws.frames] == [{"type": "pong"}] * 2
+
+    def test_send_failure_is_reported_to_later_callers(self) -> None:
+        """After the socket fails, send_text raises instead of queueing."""
+
+        async def run() -> None:
+            sender = BatchingSender(FakeWebSocket(fail=True))
+            await sender.send_text("{}")
+            await asyncio.sleep(0.01)
+            with pytest.raises(RuntimeError):
+                await sender.send_text("{}")
+            await sender.close()
+
+        asyncio.run(run())
+
+    def test_large_burst_is_split_across_frames(self) -> None:
+        """Bursts beyond MAX_BATCH_ITEMS go out as several ordered frames."""
+
+        async def run() -> FakeWebSocket:
+            ws = FakeWebSocket()
+            sender = BatchingSender(ws)
+            for i in range(MAX_BATCH_ITEMS + 1):
+                await json_utils.send_json(sender, {"type": "delta", "i": i})
+            await sender.close()
+            return ws
+
+        ws = asyncio.run(run())
+        assert len(ws.frames) == 2
+        first, second = (json.loads(f) for f in ws.frames)
+        assert len(first["items"]) == MAX_BATCH_ITEMS
+        assert second == {"type": "delta", "i": MAX_BATCH_ITEMS}
+
+    def test_backlog_tracks_unsent_characters(self) -> None:
+        """backlog counts queued text until it has been sent."""
+
+        async def run() -> None:
+            sender = BatchingSender(FakeWebSocket())
+            await sender.send_text('{"a":1}')
+            await sender.send_text('{"b":2}')
+            assert sender.backlog == 14
+            await sender.close()
+            assert sender.backlog == 0
+
+        asyncio.run(run())
+
+    def test_slow_client_holds_producer_at_backlog_cap(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """send_text waits at MAX_BACKLOG_CHARS instead of growing the queue."""
+        monkeypatch.setattr(batching, "MAX_BACKLOG_CHARS", 100)
+
+        async def run() -> None:
+            ws = SlowWebSocket()
+            sender = BatchingSender(ws)
+            queued = 0
+
+            async def produce() -> None:
+                nonlocal queued
+                for i in range(100):
+                    await json_utils.send_json(sender, {"i": i})
+                    queued += 1
+
+            producer = asyncio.create_task(produce())
+            await asyncio.sleep(0.01)
+            assert not producer.done()
+            assert queued < 100
+            assert sender.backlog <= 100 + len('{"i":99}')
+
+            ws.release.set()
+            await producer
+            await sender.close()
+
+            items = []
+            for frame in ws.frames:
+                data = json.loads(frame)
+                items.extend(data["items"] if data.get("type") == "batch" else [data])
+            assert [item["i"] for item in items] == list(range(100))
+
+        asyncio.run(run())
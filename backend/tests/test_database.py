@@ -0,0 +1,347 @@
+"""
+Tests for the SQLite persistence layer (amplifier_web.database).
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from amplifier_web.database import Database, Operation, Role, SessionStatus
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> Database:
+    """Fresh database in a temporary directory."""
+    database = Database(tmp_path / "test.db")
+    yield database
+    database.close()
+
+
+def _create_legacy_db(path: Path) -> None:
+    """Write a schema-version-0 database (ISO text timestamps and enums)."""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE sessions (
+            id TEXT PRIMARY KEY, bundle_name TEXT NOT NULL, name TEXT,
+            cwd TEXT, status TEXT DEFAULT 'active',
+            turn_count INTEGER DEFAULT 0,
+            created_at TEXT NOT NULL, updated_at TEXT NOT NULL
+        );
+        CREATE TABLE messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL,
+            role TEXT NOT NULL, content TEXT, tool_calls TEXT,
+            tool_call_id TEXT, name TEXT, timestamp TEXT NOT NULL
+        );
+        CREATE TABLE artifacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL,
+            message_id INTEGER, file_path TEXT NOT NULL,
+            operation TEXT NOT NULL, content_before TEXT, content_after TEXT,
+            diff TEXT, timestamp TEXT NOT NULL
+        );
+        INSERT INTO sessions VALUES ('s1', 'foundation', NULL, NULL, 'active',
+            1, '2024-05-01T10:00:00.250000Z', '2024-05-01T10:05:00.000000Z');
+        INSERT INTO messages (session_id, role, content, timestamp)
+            VALUES ('s1', 'user', 'hi', '2024-05-01T10:05:00.000000Z');
+        INSERT INTO artifacts (session_id, file_path, operation, timestamp)
+            VALUES ('s1', '/tmp/a.py', 'create', '2024-05-01T10:06:00Z');
+    """)
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.unit
+class TestDatabase:
+    """Tests for Database session, message, and artifact operations."""
+
+    def test_session_roundtrip(self, db: Database) -> None:
+        """Sessions can be created, updated, listed, and deleted."""
+        created = db.create_session("s1", "foundation", cwd="/tmp", name="First")
+        assert created["id"] == "s1"
+        assert created["status"] == "active"
+
+        db.update_session("s1", name="Renamed", turn_count=3)
+        session = db.get_session("s1")
+        assert session["name"] == "Renamed"
+        assert session["turn_count"] == 3
+
+        assert [s["id"] for s in db.list_sessions()] == ["s1"]
+        assert db.session_exists("s1")
+
+        db.delete_session("s1")
+        assert db.get_session("s1") is None
+        assert not db.session_exists("s1")
+
+    def test_messages_preserve_order_and_tool_calls(self, db: Database) -> None:
+        """Messages come back in insertion order with tool_calls decoded."""
+        db.create_session("s1", "foundation")
+        tool_calls = [{"id": "t1", "name": "read_file", "arguments": {"path": "x"}}]
+        db.add_message("s1", "user", "hello")
+        db.add_message("s1", "assistant", None, tool_calls=tool_calls)
+
+        messages = db.get_messages("s1")
+        assert [m["role"] for m in messages] == ["user", "assistant"]
+        assert messages[0]["tool_calls"] is None
+        assert messages[1]["tool_calls"] == tool_calls
+        assert db.get_session("s1")["turn_count"] == 2
+
+    def test_artifacts_without_session_row(self, db: Database) -> None:
+        """Artifacts can be recorded for sessions not in the sessions table."""
+        artifact_id = db.add_artifact(
+            "untracked",
+            "/tmp/file.txt",
+            "create",
+            content_after="new",
+            diff="+new",
+        )
+        artifact = db.get_artifact(artifact_id)
+        assert artifact["file_path"] == "/tmp/file.txt"
+        assert artifact["content_after"] == "new"
+        assert [a["id"] for a in db.get_artifacts("untracked")] == [artifact_id]
+
+    def test_delete_session_cascades(self, db: Database) -> None:
+        """Deleting a session removes its messages and artifacts."""
+        db.create_session("s1", "foundation")
+        db.add_message("s1", "user", "hi")
+        db.add_artifact("s1", "/tmp/a", "create")
+        db.add_artifact("orphan", "/tmp/b", "create")
+
+        db.delete_session("s1")
+        assert db.get_messages("s1") == []
+        assert db.get_artifacts("s1") == []
+
+        # Sessions without a row still get their artifacts cleaned up
+        db.delete_session("orphan")
+        assert db.get_artifacts("orphan") == []
+
+    def test_add_artifacts_bulk(self, db: Database) -> None:
+        """Bulk-inserted artifacts are stored in order."""
+        count = db.add_artifacts_bulk(
+            "s1",
+            [
+                {"file_path": "/tmp/a", "operation": "create", "content_after": "a"},
+                {"file_path": "/tmp/b", "operation": "edit", "diff": "-x\n+y"},
+            ],
+        )
+        assert count == 2
+        assert db.add_artifacts_bulk("s1", []) == 0
+
+        artifacts = db.get_artifacts("s1")
+        assert [a["file_path"] for a in artifacts] == ["/tmp/a", "/tmp/b"]
+        assert artifacts[1]["diff"] == "-x\n+y"
+
+    def test_add_artifacts_bulk_keeps_created_at(self, db: Database) -> None:
+        """A per-artifact created_at overrides the insert time."""
+        db.add_artifacts_bulk(
+            "s1",
+            [{"file_path": "/tmp/a", "operation": "create", "created_at": 0}],
+        )
+
+        assert db.get_artifacts("s1")[0]["timestamp"].startswith("1970-01-01")
+
+    def test_artifacts_json_matches_row_getter(self, db: Database) -> None:
+        """SQLite-built artifacts JSON matches the dict-based getter."""
+        db.create_session("s1", "foundation")
+        db.add_artifact("s1", "/tmp/a", "create", content_after="a")
+
+        assert json.loads(db.get_artifacts_json("s1")) == db.get_artifacts("s1")
+        assert json.loads(db.get_artifacts_json("missing")) == []
+
+    def test_large_artifact_content_is_compressed(self, db: Database) -> None:
+        """Large file contents are stored compressed and read back intact."""
+        big = "line of source code\n" * 1000
+        artifact_id = db.add_artifact(
+            "s1", "/tmp/big.py", "edit", content_before=big, content_after=big + "x"
+        )
+
+        row = db._conn.execute(
+            "SELECT content_before, content_before_z FROM artifacts WHERE id = ?",
+            (artifact_id,),
+        ).fetchone()
+        assert row["content_before"] is None
+        assert len(row["content_before_z"]) < len(big)
+
+        artifact = db.get_artifact(artifact_id)
+        assert artifact["content_before"] == big
+        assert artifact["content_after"] == big + "x"
+        assert "content_before_z" not in artifact
+
+        assert json.loads(db.get_artifacts_json("s1"))[0]["content_after"] == big + "x"
+
+    def test_timestamps_stored_as_epoch_ns(self, db: Database) -> None:
+        """Timestamps are INTEGER ns in the table and ISO 8601 UTC when read."""
+        db.create_session("s1", "foundation")
+        db.add_artifact("s1", "/tmp/a.py", "create")
+
+        raw = db._conn.execute("SELECT created_at FROM sessions").fetchone()[0]
+        assert isinstance(raw, int)
+
+        for value in (
+            db.get_session("s1")["created_at"],
+            db.get_artifacts("s1")[0]["timestamp"],
+            json.loads(db.get_artifacts_json("s1"))[0]["timestamp"],
+        ):
+            assert value.endswith("Z")
+            datetime.fromisoformat(value.rstrip("Z"))
+
+    def test_enum_columns_stored_as_integer_codes(self, db: Database) -> None:
+        """status/role/operation are INTEGER codes but read back as strings."""
+        db.create_session("s1", "foundation")
+        db.update_session("s1", status="saved")
+        db.add_message("s1", "assistant", "hi")
+        db.add_artifact("s1", "/tmp/a.py", "bash")
+
+        raw = db._conn.execute(
+            "SELECT s.status, m.role, a.operation FROM sessions s "
+            "JOIN messages m ON m.session_id = s.id "
+            "JOIN artifacts a ON a.session_id = s.id"
+        ).fetchone()
+        assert tuple(raw) == (SessionStatus.SAVED, Role.ASSISTANT, Operation.BASH)
+
+        assert db.get_session("s1")["status"] == "saved"
+        assert db.get_messages("s1")[0]["role"] == "assistant"
+        assert db.get_artifacts("s1")[0]["operation"] == "bash"
+
+        with pytest.raises(ValueError):
+            db.add_message("s1", "narrator", "hi")
+
+    def test_migrates_legacy_text_timestamps(self, tmp_path: Path) -> None:
+        """Databases with ISO text timestamps are converted on open."""
+        path = tmp_path / "legacy.db"
+        _create_legacy_db(path)
+
+        database = Database(path)
+        try:
+            session = database.get_session("s1")
+            assert session["created_at"] == "2024-05-01T10:00:00.250Z"
+            assert session["turn_count"] == 1
+            assert database.get_messages("s1")[0]["content"] == "hi"
+            artifact = database.get_artifacts("s1")[0]
+            assert artifact["timestamp"] == "2024-05-01T10:06:00.000Z"
+
+            database.add_message("s1", "assistant", "hello")
+            assert database.get_session("s1")["turn_count"] == 2
+        finally:
+            database.close()
+
+    def test_migrates_unknown_legacy_enum_values(self, tmp_path: Path) -> None:
+        """Unrecognized legacy status/role/operation strings get defaults."""
+        path = tmp_path / "legacy.db"
+        _create_legacy_db(path)
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            INSERT INTO sessions VALUES ('s2', 'foundation', NULL, NULL,
+                'archived', 0, '2024-05-01T10:00:00Z', '2024-05-01T10:00:00Z');
+            INSERT INTO sessions VALUES ('s3', 'foundation', NULL, NULL,
+                NULL, 0, '2024-05-01T10:00:00Z', '2024-05-01T10:00:00Z');
+            INSERT INTO messages (session_id, role, content, timestamp)
+                VALUES ('s2', 'function', 'a', '2024-05-01T10:00:00Z'),
+                       ('s2', 'Assistant', 'b', '2024-05-01T10:00:01Z');
+            INSERT INTO artifacts (session_id, file_path, operation, timestamp)
+                VALUES ('s2', '/tmp/b.py', 'rename', '2024-05-01T10:00:00Z');
+        """)
+        conn.close()
+
+        database = Database(path)
+        try:
+            assert database.get_session("s2")["status"] == "active"
+            assert database.get_session("s3")["status"] == "active"
+            roles = [m["role"] for m in database.get_messages("s2")]
+            assert roles == ["user", "assistant"]
+            assert database.get_artifacts("s2")[0]["operation"] == "edit"
+        finally:
+            database.close()
+
+    def test_failed_migration_leaves_database_unchanged(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A migration that fails part way rolls back and is retried on open."""
+        path = tmp_path / "legacy.db"
+        _create_legacy_db(path)
+
+        def fail(conn: sqlite3.Connection, from_version: int) -> None:
+            raise sqlite3.OperationalError("disk I/O error")
+
+        with monkeypatch.context() as m:
+            m.setattr(Database, "_copy_legacy_tables", staticmethod(fail))
+            with pytest.raises(sqlite3.OperationalError):
+                Database(path)
+
+        conn = sqlite3.connect(path)
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+        conn.close()
+        assert "sessions_legacy" not in tables
+
+        database = Database(path)
+        try:
+            assert database.get_messages("s1")[0]["content"] == "hi"
+            assert database.get_artifacts("s1")[0]["file_path"] == "/tmp/a.py"
+        finally:
+            database.close()
+
+    def test_resumes_interrupted_migration(self, tmp_path: Path) -> None:
+        """Leftover *_legacy tables from an interrupted migration are copied."""
+        path = tmp_path / "legacy.db"
+        _create_legacy_db(path)
+        conn = sqlite3.connect(path)
+        for table in ("sessions", "messages", "artifacts"):
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+        conn.execute("CREATE TABLE sessions (id TEXT PRIMARY KEY)")
+        conn.commit()
+        conn.close()
+
+        database = Database(path)
+        try:
+            assert database.get_session("s1")["turn_count"] == 1
+            assert database.get_messages("s1")[0]["content"] == "hi"
+            tables = {
+                r[0]
+                for r in database._conn.execute("SELECT name FROM sqlite_master")
+            }
+            assert not any(name.endswith("_legacy") for name in tables)
+        finally:
+            database.close()
+
+    def test_session_reads_use_composite_index(self, db: Database) -> None:
+        """Per-session ordered reads come straight off (session_id, id)."""
+        for table in ("messages", "artifacts"):
+            plan = " ".join(
+                row[3]
+                for row in db._conn.execute(
+                    f"EXPLAIN QUERY PLAN SELECT * FROM {table} "
+                    "WHERE session_id = ? ORDER BY id ASC",
+                    ("s1",),
+                )
+            )
+            assert f"idx_{table}_session_id" in plan
+            assert "TEMP B-TREE" not in plan
+
+    def test_connection_is_reused(self, db: Database) -> None:
+        """The same connection serves consecutive calls."""
+        db.create_session("s1", "foundation")
+        conn = db._conn
+        db.get_session("s1")
+        db.list_sessions()
+        assert db._conn is conn
+
+    def test_concurrent_writes_from_threads(self, db: Database) -> None:
+        """The shared connection is safe to use from multiple threads."""
+        db.create_session("s1", "foundation")
+
+        def write(n: int) -> None:
+            for i in range(20):
+                db.add_artifact("s1", f"/tmp/{n}-{i}", "edit")
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(db.get_artifacts("s1")) == 80
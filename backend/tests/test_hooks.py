@@ -0,0 +1,202 @@
+"""
+Tests for the browser streaming hook (amplifier_web.protocols.hooks).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from amplifier_web.protocols import hooks
+from amplifier_web.protocols.hooks import WebStreamingHook
+
+
+class FakeSender:
+    """Stands in for BatchingSender, recording decoded messages."""
+
+    def __init__(self, backlog: int = 0):
+        self.messages: list[dict] = []
+        self.backlog = backlog
+
+    async def send_text(self, text: str) -> None:
+        self.messages.append(json.loads(text))
+
+
+@pytest.fixture
+def hook() -> WebStreamingHook:
+    """Hook tracking artifacts for session s1 (no socket needed)."""
+    return WebStreamingHook(None, session_id="s1")
+
+
+def _write_file_op(
+    content_before: str | None, existed: bool, content: str = "new\n"
+) -> dict:
+    """Pending write_file op as left by tool:pre and tool:post."""
+    return {
+        "tool_name": "write_file",
+        "arguments": {"file_path": "/tmp/a.txt", "content": content},
+        "content_before": content_before,
+        "existed": existed,
+        "session_id": "s1",
+        "created_at": 0,
+    }
+
+
+@pytest.mark.unit
+class TestBuildArtifact:
+    """Tests for turning write_file operations into artifact records."""
+
+    def test_new_file_is_create_with_full_diff(self, hook: WebStreamingHook) -> None:
+        """A file that didn't exist is recorded as created."""
+        artifact = hook._build_artifact(_write_file_op(None, existed=False))
+
+        assert artifact["operation"] == "create"
+        assert "+new" in artifact["diff"]
+
+    def test_edit_diffs_against_captured_content(self, hook: WebStreamingHook) -> None:
+        """An overwritten file is diffed against its previous content."""
+        artifact = hook._build_artifact(_write_file_op("old\n", existed=True))
+
+        assert artifact["operation"] == "edit"
+        assert "-old" in artifact["diff"]
+        assert "+new" in artifact["diff"]
+
+    def test_uncaptured_existing_file_has_no_diff(self, hook: WebStreamingHook) -> None:
+        """Overwriting a file too large to capture records no bogus diff."""
+        artifact = hook._build_artifact(_write_file_op(None, existed=True))
+
+        assert artifact["operation"] == "edit"
+        assert artifact["content_before"] is None
+        assert artifact["diff"] is None
+
+
+@pytest.mark.unit
+class TestClose:
+    """Tests for shutting the hook down."""
+
+    def test_close_does_not_wait_on_a_stopped_worker(self) -> None:
+        """Items left by a cancelled worker don't block close()."""
+
+        async def run() -> None:
+            hook = WebStreamingHook(None, session_id="s1")
+            hook._artifact_task = asyncio.create_task(asyncio.sleep(10))
+            hook._artifact_task.cancel()
+            await asyncio.sleep(0)
+            hook._artifact_queue.put_nowait(_write_file_op(None, existed=False))
+
+            await asyncio.wait_for(hook.close(), timeout=1)
+            assert hook._artifact_task is None
+
+        asyncio.run(run())
+
+
+def _delta(text: str, index: int = 0, **extra: str) -> dict:
+    """content_block:delta event data."""
+    return {"index": index, "delta": text, **extra}
+
+
+@pytest.mark.unit
+class TestDeltaCoalescing:
+    """Tests for merging content deltas without reordering messages."""
+
+    def test_consecutive_deltas_merge(self) -> None:
+        """Deltas for one block go out as one content_delta."""
+
+        async def run() -> FakeSender:
+            sender = FakeSender()
+            hook = WebStreamingHook(sender)
+            for text in ("Hel", "lo", "!"):
+                await hook("content_block:delta", _delta(text))
+            await hook.flush()
+            return sender
+
+        sender = asyncio.run(run())
+        assert [(m["type"], m["delta"]) for m in sender.messages] == [
+            ("content_delta", "Hello!")
+        ]
+
+    def test_other_block_flushes_pending_delta(self) -> None:
+        """A delta for another index or sub-session sends the pending one."""
+
+        async def run() -> FakeSender:
+            sender = FakeSender()
+            hook = WebStreamingHook(sender)
+            await hook("content_block:delta", _delta("a"))
+            await hook("content_block:delta", _delta("b", index=1))
+            await hook("content_block:delta", _delta("c", index=1))
+            await hook("content_block:delta", _delta("d", 1, child_session_id="x"))
+            await hook.flush()
+            return sender
+
+        sender = asyncio.run(run())
+        assert [(m["index"], m["delta"]) for m in sender.messages] == [
+            (0, "a"),
+            (1, "bc"),
+            (1, "d"),
+        ]
+        assert sender.messages[2]["child_session_id"] == "x"
+
+    def test_other_messages_follow_pending_delta(self) -> None:
+        """content_end and tool_call are sent after the delta before them."""
+
+        async def run() -> FakeSender:
+            sender = FakeSender()
+            hook = WebStreamingHook(sender)
+            await hook("content_block:start", {"index": 0, "block_type": "text"})
+            await hook("content_block:delta", _delta("text"))
+            await hook("content_block:end", {"index": 0})
+            await hook("content_block:delta", _delta("more", index=1))
+            await hook("tool:pre", {"tool_name": "grep", "tool_call_id": "t1"})
+            return sender
+
+        sender = asyncio.run(run())
+        assert [m["type"] for m in sender.messages] == [
+            "content_start",
+            "content_delta",
+            "content_end",
+            "content_delta",
+            "tool_call",
+        ]
+        assert sender.messages[3]["delta"] == "more"
+
+
+@pytest.mark.unit
+class TestBackpressure:
+    """Tests for holding merged deltas while the client is backlogged."""
+
+    def test_backlogged_delta_is_held_at_most_max_hold(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A backlog delays the merged delta, but only up to the hold cap."""
+        monkeypatch.setattr(hooks, "MAX_DELTA_HOLD_SECONDS", 0.05)
+
+        async def run() -> FakeSender:
+            sender = FakeSender(backlog=10**9)  # Client never catches up
+            hook = WebStreamingHook(sender)
+            for _ in range(3):
+                await hook("content_block:delta", {"index": 0, "delta": "x"})
+            await asyncio.sleep(0.02)
+            assert sender.messages == []
+            await asyncio.sleep(0.1)
+            return sender
+
+        sender = asyncio.run(run())
+        assert [m["delta"] for m in sender.messages] == ["xxx"]
+
+    def test_large_merged_delta_is_sent_inline(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A merged delta reaching MAX_PENDING_DELTA_CHARS goes out at once."""
+        monkeypatch.setattr(hooks, "MAX_PENDING_DELTA_CHARS", 10)
+
+        async def run() -> FakeSender:
+            sender = FakeSender(backlog=10**9)
+            hook = WebStreamingHook(sender)
+            for _ in range(3):
+                await hook("content_block:delta", {"index": 0, "delta": "abcd"})
+            return sender
+
+        sender = asyncio.run(run())
+        assert [m["delta"] for m in sender.messages] == ["abcdabcdabcd"]
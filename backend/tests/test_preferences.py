@@ -0,0 +1,112 @@
+"""
+Tests for user preferences storage (amplifier_web.preferences).
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from amplifier_web import preferences
+
+
+@pytest.fixture
+def prefs_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the preferences module at a temporary file with a cold cache."""
+    path = tmp_path / "web-preferences.json"
+    monkeypatch.setattr(preferences, "PREFS_DIR", tmp_path)
+    monkeypatch.setattr(preferences, "PREFS_FILE", path)
+    monkeypatch.setattr(preferences, "_cached_prefs", None)
+    monkeypatch.setattr(preferences, "_cached_stat", None)
+    return path
+
+
+@pytest.mark.unit
+class TestPreferencesCache:
+    """Tests for the in-process preferences cache."""
+
+    def test_missing_file_returns_defaults(self, prefs_file: Path) -> None:
+        """Without a file, defaults are returned."""
+        assert preferences.load_preferences() == preferences.UserPreferences()
+
+    def test_unchanged_file_is_parsed_once(self, prefs_file: Path) -> None:
+        """Repeated loads of an unchanged file reuse the parsed result."""
+        preferences.update_preferences({"default_bundle": "custom"})
+
+        with patch.object(
+            preferences, "_read_preferences", wraps=preferences._read_preferences
+        ) as read:
+            assert preferences.load_preferences().default_bundle == "custom"
+            assert preferences.load_preferences().default_bundle == "custom"
+            assert read.call_count == 0  # Warmed by save_preferences
+
+    def test_external_edit_is_picked_up(self, prefs_file: Path) -> None:
+        """A file changed on disk is re-read."""
+        preferences.update_preferences({"default_bundle": "custom"})
+
+        prefs_file.write_text('{"default_bundle": "edited-by-hand"}')
+        st = prefs_file.stat()
+        os.utime(prefs_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert preferences.load_preferences().default_bundle == "edited-by-hand"
+
+    def test_callers_get_independent_copies(self, prefs_file: Path) -> None:
+        """Mutating a loaded instance does not leak into the cache."""
+        preferences.add_custom_bundle("file:///tmp/b", "b")
+
+        prefs = preferences.load_preferences()
+        prefs.custom_bundles.clear()
+
+        assert len(preferences.load_preferences().custom_bundles) == 1
+
+
+@pytest.mark.unit
+class TestCustomEntries:
+    """Tests for uri-keyed custom bundles and behaviors."""
+
+    def test_legacy_list_format_is_migrated(self, prefs_file: Path) -> None:
+        """Old list-of-dicts entries load as a uri-keyed dict."""
+        prefs_file.write_text(
+            '{"custom_bundles": [{"uri": "file:///a", "name": "a",'
+            ' "description": "A"}], "custom_behaviors": []}'
+        )
+
+        prefs = preferences.load_preferences()
+
+        assert prefs.custom_bundles == {"file:///a": {"name": "a", "description": "A"}}
+        assert prefs.custom_behaviors == {}
+
+    def test_malformed_entries_are_dropped(self, prefs_file: Path) -> None:
+        """Null or non-dict custom entries load as empty instead of raising."""
+        prefs_file.write_text(
+            '{"custom_bundles": null, "custom_behaviors": ["file:///x", 3,'
+            ' {"uri": "file:///y", "name": "y"}]}'
+        )
+
+        prefs = preferences.load_preferences()
+
+        assert prefs.custom_bundles == {}
+        assert prefs.custom_behaviors == {
+            "file:///y": {"name": "y", "description": ""}
+        }
+
+    def test_add_updates_existing_uri(self, prefs_file: Path) -> None:
+        """Re-adding a uri replaces its entry instead of duplicating it."""
+        preferences.add_custom_behavior("file:///x", "x")
+        prefs = preferences.add_custom_behavior("file:///x", "renamed", "d")
+
+        assert prefs.custom_behaviors == {
+            "file:///x": {"name": "renamed", "description": "d"}
+        }
+
+    def test_remove_by_name(self, prefs_file: Path) -> None:
+        """Entries are removed by display name."""
+        preferences.add_custom_bundle("file:///a", "a")
+        preferences.add_custom_bundle("file:///b", "b")
+
+        prefs = preferences.remove_custom_bundle("a")
+
+        assert list(prefs.custom_bundles) == ["file:///b"]
@@ -451,6 +451,15 @@ class TestWebSocketAuth:
             result = verify_websocket_token(wrong_token)
             assert result is False
 
+    def test_verify_websocket_token_rejects_non_ascii_token(self) -> None:
+        """
+        Test that non-ASCII tokens are rejected rather than raising.
+
+        Verifies:
+        - secrets.compare_digest TypeError on non-ASCII str is avoided
+        """
+        assert verify_websocket_token("tökén") is False
+
     def test_get_or_create_token_consistency(self) -> None:
         """
         Test that get_or_create_token returns consistent token.
@@ -478,6 +487,32 @@ class TestWebSocketAuth:
             token = get_or_create_token()
             assert token == custom_token
 
+    def test_get_or_create_token_caches_file_token(self) -> None:
+        """
+        Test that the file-backed token is only read from disk once.
+
+        Verifies:
+        - Repeated calls don't re-read the token file
+        - Invalidating the cache forces a fresh read
+        """
+        from amplifier_web import auth
+
+        with patch.dict(os.environ, {}, clear=True):
+            # Ensure the token file exists, then start from a cold cache
+            get_or_create_token()
+            auth._invalidate_token_cache()
+            with patch.object(
+                auth, "_read_token_from_file", wraps=auth._read_token_from_file
+            ) as read_mock:
+                token1 = get_or_create_token()
+                token2 = get_or_create_token()
+                assert token1 == token2
+                assert read_mock.call_count == 1
+
+                auth._invalidate_token_cache()
+                assert get_or_create_token() == token1
+                assert read_mock.call_count == 2
+
     def test_websocket_token_verification_integration(self) -> None:
         """
         Test WebSocket token verification flow end-to-end.
@@ -0,0 +1,97 @@
+"""
+Tests for prompt execution in the session manager (amplifier_web.session_manager).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from amplifier_web.protocols import WebStreamingHook
+from amplifier_web.session_manager import ActiveSession, SessionManager, SessionMetadata
+
+
+class FakeSender:
+    """Stands in for BatchingSender, recording decoded messages."""
+
+    backlog = 0
+
+    def __init__(self):
+        self.messages: list[dict] = []
+
+    async def send_text(self, text: str) -> None:
+        self.messages.append(json.loads(text))
+
+
+class FakeAmplifierSession:
+    """Streams one text delta through the hook, then ends as told."""
+
+    def __init__(self, hook: WebStreamingHook, outcome: BaseException | None):
+        self.coordinator = SimpleNamespace(
+            cancellation=SimpleNamespace(reset=lambda: None)
+        )
+        self._hook = hook
+        self._outcome = outcome
+
+    async def execute(self, content: Any) -> str:
+        await self._hook("content_block:delta", {"index": 0, "delta": "partial"})
+        if self._outcome is not None:
+            raise self._outcome
+        return "done"
+
+
+def _run_execute(tmp_path: Path, outcome: BaseException | None) -> list[dict]:
+    """Execute one prompt and return the messages sent to the browser."""
+
+    async def run() -> list[dict]:
+        sender = FakeSender()
+        hook = WebStreamingHook(sender)
+        manager = SessionManager(bundle_manager=None, storage_dir=tmp_path)
+        manager._active["s1"] = ActiveSession(
+            session_id="s1",
+            websocket=sender,
+            metadata=SessionMetadata(session_id="s1", bundle_name="test"),
+            prepared=None,
+            display=None,
+            approval=None,
+            streaming_hook=hook,
+            amplifier_session=FakeAmplifierSession(hook, outcome),
+        )
+
+        async def no_transcript(active: ActiveSession) -> None:
+            pass
+
+        manager._save_transcript = no_transcript
+        try:
+            await manager.execute("s1", "hello")
+        except (Exception, asyncio.CancelledError):
+            pass
+        return sender.messages
+
+    return asyncio.run(run())
+
+
+@pytest.mark.unit
+class TestExecuteFlushesDeltas:
+    """The last merged delta always precedes the turn's final message."""
+
+    @pytest.mark.parametrize(
+        ("outcome", "final_type"),
+        [
+            (None, "prompt_complete"),
+            (asyncio.CancelledError(), "execution_cancelled"),
+            (RuntimeError("boom"), "execution_error"),
+        ],
+    )
+    def test_pending_delta_is_sent_before_final_message(
+        self, tmp_path: Path, outcome: BaseException | None, final_type: str
+    ) -> None:
+        messages = _run_execute(tmp_path, outcome)
+
+        assert [m["type"] for m in messages] == ["content_delta", final_type]
+        assert messages[0]["delta"] == "partial"
@@ -0,0 +1,59 @@
+"""
+Tests for precompressed frontend asset serving (amplifier_web.static).
+"""
+
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from amplifier_web.static import PrecompressedStaticFiles
+
+SCRIPT = b"console.log('hello');\n" * 100
+
+
+@pytest.fixture
+def client(tmp_path: Path) -> TestClient:
+    """App serving a dist/ dir with a gzip-precompressed script."""
+    (tmp_path / "app.js").write_bytes(SCRIPT)
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(SCRIPT))
+    (tmp_path / "plain.css").write_text("body {}")
+    app = Starlette(
+        routes=[Mount("/", PrecompressedStaticFiles(directory=tmp_path, html=True))]
+    )
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestPrecompressedStaticFiles:
+    """Tests for Accept-Encoding negotiation."""
+
+    def test_serves_gzip_variant_when_accepted(self, client: TestClient) -> None:
+        """The .gz sibling is sent with the original content type."""
+        response = client.get("/app.js", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("text/javascript")
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == SCRIPT  # Decoded by the client
+
+    def test_serves_original_when_not_accepted(self, client: TestClient) -> None:
+        """Clients that refuse gzip get the uncompressed file."""
+        response = client.get("/app.js", headers={"Accept-Encoding": "gzip;q=0"})
+
+        assert "content-encoding" not in response.headers
+        assert response.content == SCRIPT
+
+    def test_falls_back_without_variant(self, client: TestClient) -> None:
+        """Assets without a precompressed sibling are served as usual."""
+        response = client.get("/plain.css", headers={"Accept-Encoding": "br, gzip"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.text == "body {}"
@@ -0,0 +1,41 @@
+/**
+ * Write .br and .gz siblings for text assets in dist/.
+ *
+ * The backend (or a reverse proxy with brotli_static / gzip_static) serves
+ * these directly, so assets are never compressed per request.
+ */
+
+import { readdirSync, readFileSync, statSync, writeFileSync } from 'node:fs';
+import { join } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib';
+
+const DIST_DIR = fileURLToPath(new URL('../dist/', import.meta.url));
+const COMPRESSIBLE = /\.(js|css|html|svg|json)$/;
+// Below this size the encoded variant saves less than the headers cost
+const MIN_BYTES = 1024;
+
+function* walk(dir) {
+  for (const name of readdirSync(dir)) {
+    const path = join(dir, name);
+    if (statSync(path).isDirectory()) {
+      yield* walk(path);
+    } else {
+      yield path;
+    }
+  }
+}
+
+for (const path of walk(DIST_DIR)) {
+  if (!COMPRESSIBLE.test(path)) continue;
+  const data = readFileSync(path);
+  if (data.length < MIN_BYTES) continue;
+
+  writeFileSync(
+    `${path}.br`,
+    brotliCompressSync(data, {
+      params: { [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY },
+    })
+  );
+  writeFileSync(`${path}.gz`, gzipSync(data, { level: 9 }));
+}
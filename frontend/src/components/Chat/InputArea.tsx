@@ -98,39 +98,26 @@ export function InputArea({ onSend, onCancel, isExecuting, authToken }: InputAre
     });
   }, []);
 
-  // Extract text from document via backend
+  // Extract text from document via backend (raw multipart upload, no base64)
   const extractDocument = useCallback(async (file: File): Promise<string> => {
-    const reader = new FileReader();
-    return new Promise((resolve, reject) => {
-      reader.onload = async (e) => {
-        const base64 = (e.target?.result as string).split(',')[1];
-        try {
-          const response = await fetch('/api/extract', {
-            method: 'POST',
-            headers: {
-              'Content-Type': 'application/json',
-              'Authorization': `Bearer ${authToken}`,
-            },
-            body: JSON.stringify({
-              filename: file.name,
-              content: base64,
-            }),
-          });
-          
-          if (!response.ok) {
-            const error = await response.json();
-            throw new Error(error.detail || 'Extraction failed');
-          }
-          
-          const result = await response.json();
-          resolve(result.text);
-        } catch (err) {
-          reject(err);
-        }
-      };
-      reader.onerror = () => reject(new Error('Failed to read file'));
-      reader.readAsDataURL(file);
+    const formData = new FormData();
+    formData.append('file', file);
+
+    const response = await fetch('/api/extract/upload', {
+      method: 'POST',
+      headers: {
+        'Authorization': `Bearer ${authToken}`,
+      },
+      body: formData,
     });
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'Extraction failed');
+    }
+
+    const result = await response.json();
+    return result.text;
   }, [authToken]);
 
   // Process a file (image or document)
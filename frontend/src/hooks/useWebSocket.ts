@@ -77,8 +77,7 @@ export function useWebSocket() {
 
   // Handle incoming messages
   const handleMessage = useCallback(
-    (event: MessageEvent) => {
-      const data = JSON.parse(event.data);
+    (data: any) => {
       const eventType = data.type || 'unknown';
 
       // Log ALL events with raw data - categorize by pattern for visual filtering
@@ -588,7 +587,14 @@ export function useWebSocket() {
       }
       // Only process other messages after authenticated
       if (wsAuthenticated) {
-        handleMessage(event);
+        // Server coalesces bursts into {type: 'batch', items: [...]}
+        if (data.type === 'batch') {
+          for (const item of data.items) {
+            handleMessage(item);
+          }
+        } else {
+          handleMessage(data);
+        }
       }
     };
 
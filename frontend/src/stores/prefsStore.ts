@@ -20,6 +20,13 @@ interface CustomBehavior {
   description: string;
 }
 
+// Server stores custom bundles/behaviors keyed by URI
+function fromUriMap(
+  entries: Record<string, { name: string; description: string }> | undefined
+): CustomBundle[] {
+  return Object.entries(entries || {}).map(([uri, entry]) => ({ uri, ...entry }));
+}
+
 interface PrefsStore {
   // State
   defaultBundle: string;
@@ -90,8 +97,8 @@ export const usePrefsStore = create<PrefsStore>((set, get) => ({
           defaultBehaviors: data.default_behaviors || ['sessions'],
           showThinking: data.show_thinking ?? true,
           defaultCwd: data.default_cwd || null,
-          customBundles: data.custom_bundles || [],
-          customBehaviors: data.custom_behaviors || [],
+          customBundles: fromUriMap(data.custom_bundles),
+          customBehaviors: fromUriMap(data.custom_behaviors),
           isLoading: false,
         });
       } else {